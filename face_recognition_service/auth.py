@@ -15,6 +15,20 @@ security = HTTPBearer(
     auto_error=False,
 )
 
+# Expected token as UTF-8 bytes, encoded once instead of on every request
+_EXPECTED_TOKEN = settings.api_token.encode("utf-8")
+
+
+def refresh_token() -> None:
+    """
+    Re-read the expected token from settings.
+
+    Call after changing settings.api_token at runtime (e.g. in tests or on a
+    configuration reload); verify_token() otherwise keeps the import-time value.
+    """
+    global _EXPECTED_TOKEN
+    _EXPECTED_TOKEN = settings.api_token.encode("utf-8")
+
 
 def verify_token(
     credentials: Annotated[HTTPAuthorizationCredentials | None, Depends(security)]
@@ -43,12 +57,10 @@ def verify_token(
         )
 
     # Extract the token from credentials
-    provided_token = credentials.credentials
+    provided_token = credentials.credentials.encode("utf-8")
 
     # Use constant-time comparison to prevent timing attacks
-    expected_token = settings.api_token
-
-    if not secrets.compare_digest(provided_token, expected_token):
+    if not secrets.compare_digest(provided_token, _EXPECTED_TOKEN):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication credentials",
@@ -0,0 +1,156 @@
+"""Dynamic micro-batching of concurrent embedding requests."""
+
+import asyncio
+import logging
+from typing import List, Optional, Set, Tuple
+
+import numpy as np
+
+from .config import settings
+from .models.face_model import get_model, run_inference
+
+logger = logging.getLogger(__name__)
+
+# Queued work item: (preprocessed image, future receiving (embedding, detection_score))
+_QueueItem = Tuple[np.ndarray, asyncio.Future]
+
+
+class EmbeddingBatcher:
+    """
+    Collect near-simultaneous embedding requests into a single model call.
+
+    A consumer task takes the first queued image, then keeps collecting until
+    either max_batch_size images are queued or max_wait_ms has elapsed, and
+    hands the batch to FaceRecognitionModel.get_embeddings_batch(). Results
+    (or per-image errors) are routed back to each caller's future.
+    """
+
+    def __init__(self, max_batch_size: int, max_wait_ms: float):
+        """
+        Initialize the batcher.
+
+        Args:
+            max_batch_size: Maximum number of images per model call
+            max_wait_ms: Maximum time to wait for a batch to fill, in milliseconds
+        """
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self._queue: Optional["asyncio.Queue[_QueueItem]"] = None
+        self._consumer: Optional[asyncio.Task] = None
+        self._inflight: Set[asyncio.Task] = set()
+
+    def is_running(self) -> bool:
+        """Check if the consumer task is running."""
+        return self._consumer is not None and not self._consumer.done()
+
+    async def start(self) -> None:
+        """Start the consumer task. Must be called from the running event loop."""
+        if self.is_running():
+            return
+        self._queue = asyncio.Queue()
+        self._consumer = asyncio.create_task(self._run(), name="embedding-batcher")
+        logger.info(
+            f"Embedding batcher started (max batch: {self.max_batch_size}, "
+            f"max wait: {self.max_wait * 1000:.1f} ms)"
+        )
+
+    async def stop(self) -> None:
+        """Stop the consumer task, finish in-flight batches and fail queued requests."""
+        if self._consumer is not None:
+            self._consumer.cancel()
+            try:
+                await self._consumer
+            except asyncio.CancelledError:
+                pass
+            self._consumer = None
+
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+
+        if self._queue is not None:
+            while not self._queue.empty():
+                _, future = self._queue.get_nowait()
+                if not future.done():
+                    future.cancel()
+            self._queue = None
+
+        logger.info("Embedding batcher stopped")
+
+    async def submit(self, image: np.ndarray) -> Tuple[np.ndarray, Optional[float]]:
+        """
+        Queue an image and wait for its embedding.
+
+        Args:
+            image: Preprocessed image as numpy array (BGR format)
+
+        Returns:
+            Tuple of (embedding, detection_score)
+
+        Raises:
+            FaceModelError: If no acceptable face is found or inference fails
+            RuntimeError: If the batcher is not running
+        """
+        if not self.is_running():
+            raise RuntimeError("Embedding batcher is not running")
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((image, future))
+        return await future
+
+    async def _collect_batch(self) -> List[_QueueItem]:
+        """Wait for the first item, then gather more until full or timed out."""
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _run(self) -> None:
+        """Consumer loop: form batches and dispatch them to the inference pool."""
+        while True:
+            batch = await self._collect_batch()
+            task = asyncio.create_task(self._process(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _process(self, batch: List[_QueueItem]) -> None:
+        """Run one batched model call and resolve the callers' futures."""
+        images = [image for image, _ in batch]
+        futures = [future for _, future in batch]
+
+        try:
+            model = get_model()
+            results = await run_inference(
+                model.get_embeddings_batch, images, True, True
+            )
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        logger.debug(f"Processed embedding batch of {len(batch)}")
+        for future, result in zip(futures, results):
+            if future.done():
+                # Caller went away (e.g. request cancelled)
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+# Global batcher instance (started in the application lifespan when enabled)
+embedding_batcher = EmbeddingBatcher(settings.batch_max_size, settings.batch_max_wait_ms)
@@ -0,0 +1,200 @@
+"""In-memory caching of face embeddings for repeated images."""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple, Union
+
+import numpy as np
+
+from .config import settings
+
+# Cached value: (embedding, detection_score)
+CachedEmbedding = Tuple[np.ndarray, Optional[float]]
+
+# Cached URL value: (validators, embedding, detection_score)
+CachedUrlEmbedding = Tuple[Dict[str, str], np.ndarray, Optional[float]]
+
+
+class EmbeddingCache:
+    """
+    Thread-safe LRU cache mapping image content digests to face embeddings.
+
+    Keys are SHA-256 digests of the submitted image data, so memory use is
+    bounded by the number of entries rather than by the size of the images.
+    """
+
+    def __init__(self, max_size: int):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size: Maximum number of cached embeddings (0 disables caching)
+        """
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[bytes, CachedEmbedding]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        """Check if caching is enabled."""
+        return self.max_size > 0
+
+    @staticmethod
+    def make_key(data: Union[bytes, str]) -> bytes:
+        """
+        Build a cache key from raw image bytes or a base64 image string.
+
+        Args:
+            data: Image data to fingerprint
+
+        Returns:
+            SHA-256 digest of the data
+        """
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        return hashlib.sha256(data).digest()
+
+    def get(self, key: bytes) -> Optional[CachedEmbedding]:
+        """
+        Look up a cached embedding and mark it as recently used.
+
+        Args:
+            key: Cache key from make_key()
+
+        Returns:
+            Tuple of (embedding, detection_score), or None on a miss
+        """
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: bytes, embedding: np.ndarray, detection_score: Optional[float]) -> None:
+        """
+        Store an embedding, evicting the least recently used entry when full.
+
+        The embedding is marked read-only since it is shared between requests.
+
+        Args:
+            key: Cache key from make_key()
+            embedding: Face embedding vector
+            detection_score: Detection confidence for the face
+        """
+        if not self.enabled:
+            return
+
+        embedding.setflags(write=False)
+        with self._lock:
+            self._entries[key] = (embedding, detection_score)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all entries and reset the hit/miss counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        """
+        Get cache usage statistics.
+
+        Returns:
+            Dictionary with size, max_size, hits and misses
+        """
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+class ImageUrlCache:
+    """
+    Thread-safe LRU cache mapping image URLs to face embeddings.
+
+    Each entry keeps the HTTP cache validators (ETag/Last-Modified) of the
+    fetched image, so a later request for the same URL can be revalidated
+    with a conditional GET and, on 304 Not Modified, skip the download,
+    decode, detection and embedding entirely.
+    """
+
+    def __init__(self, max_size: int):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size: Maximum number of cached URLs (0 disables caching)
+        """
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, CachedUrlEmbedding]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, url: str) -> Optional[CachedUrlEmbedding]:
+        """
+        Look up the cached embedding for a URL and mark it as recently used.
+
+        Args:
+            url: Image URL
+
+        Returns:
+            Tuple of (validators, embedding, detection_score), or None on a miss
+        """
+        if self.max_size <= 0:
+            return None
+
+        with self._lock:
+            value = self._entries.get(url)
+            if value is not None:
+                self._entries.move_to_end(url)
+            return value
+
+    def put(
+        self,
+        url: str,
+        validators: Dict[str, str],
+        embedding: np.ndarray,
+        detection_score: Optional[float],
+    ) -> None:
+        """
+        Store the embedding of a fetched image; URLs without validators are skipped.
+
+        Args:
+            url: Image URL
+            validators: Conditional request headers from fetch_image_bytes_async()
+            embedding: Face embedding vector
+            detection_score: Detection confidence for the face
+        """
+        if self.max_size <= 0 or not validators:
+            return
+
+        embedding.setflags(write=False)
+        with self._lock:
+            self._entries[url] = (validators, embedding, detection_score)
+            self._entries.move_to_end(url)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+
+
+# Global embedding cache instances
+embedding_cache = EmbeddingCache(settings.embedding_cache_size)
+image_url_cache = ImageUrlCache(settings.image_url_cache_size)
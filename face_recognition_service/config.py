@@ -26,7 +26,7 @@ class Settings(BaseSettings):
     # Server Settings
     host: str = "0.0.0.0"
     port: int = 8000
-    workers: int = 1
+    workers: int = 1  # Server processes for `python -m face_recognition_service.main` (0 = one per CPU; ignored in debug)
     log_level: Literal["debug", "info", "warning", "error", "critical"] = "info"
 
     # CORS Settings
@@ -45,22 +45,45 @@ class Settings(BaseSettings):
 
     # Device Settings
     device: Literal["cpu", "cuda"] = "cpu"
-    providers: list[str] | None = None  # ONNX Runtime providers
+    providers: list[str | tuple[str, dict[str, str]]] | None = None  # ONNX Runtime providers
 
     # Image Processing Settings
     max_image_size: int = 10 * 1024 * 1024  # 10 MB
     allowed_image_formats: set[str] = {"jpg", "jpeg", "png", "bmp", "webp"}
     enhance_image: bool = True  # Apply CLAHE + auto-gamma correction before face detection
+    jpeg_decode_min_side: int = 0  # Decode large JPEGs at 1/2-1/8 scale, keeping the longer side >= this (0 disables)
 
     # Performance Settings
     request_timeout: int = 30  # seconds
+    inference_workers: int = 2  # Threads running blocking ONNX inference concurrently
+    batching_enabled: bool = False  # Micro-batch concurrent embedding requests into one model call
+    batch_max_size: int = 8  # Maximum images per batched model call
+    batch_max_wait_ms: float = 8.0  # Maximum time a request waits for its batch to fill
+    ort_intra_op_threads: int = 0  # ONNX Runtime threads per session (0 = ORT default: one per physical core)
+    ort_optimized_model_cache: bool = True  # Cache graph-optimized models on disk (CPU only) to skip re-optimizing on restart
+    warmup_iterations: int = 2  # Dummy forward passes at startup to absorb ORT first-call cost (0 disables)
+    embedding_cache_size: int = 1024  # Max cached embeddings for repeated images (0 disables)
+    image_url_cache_size: int = 1024  # Max image URLs whose embeddings are revalidated via ETag/Last-Modified (0 disables)
+    embedding_precision: Literal["fp32", "fp16"] = "fp32"  # Storage precision of reference galleries during /compare
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         # Set ONNX Runtime providers based on device
         if self.providers is None:
             if self.device == "cuda":
-                self.providers = ["CUDAExecutionProvider", "CPUExecutionProvider"]
+                # Heuristic cuDNN algo selection avoids the long exhaustive search on the
+                # first call; kSameAsRequested keeps the arena from over-allocating
+                self.providers = [
+                    (
+                        "CUDAExecutionProvider",
+                        {
+                            "cudnn_conv_algo_search": "HEURISTIC",
+                            "arena_extend_strategy": "kSameAsRequested",
+                            "do_copy_in_default_stream": "1",
+                        },
+                    ),
+                    "CPUExecutionProvider",
+                ]
             else:
                 self.providers = ["CPUExecutionProvider"]
 
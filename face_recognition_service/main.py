@@ -1,36 +1,58 @@
 """FastAPI application for face recognition microservice."""
 
-import base64
+import asyncio
 import logging
 from contextlib import asynccontextmanager
-from typing import Annotated, List
+from typing import Annotated, Callable, List, Optional, Tuple
 
+import numpy as np
 from fastapi import Depends, FastAPI, File, Form, HTTPException, UploadFile, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 
 from .auth import verify_token
+from .batcher import embedding_batcher
+from .cache import embedding_cache, image_url_cache
 from .config import settings
 from .models.face_model import (
     FaceModelError,
+    FaceRecognitionModel,
     cleanup_model,
     get_model,
     initialize_model,
+    run_inference,
 )
 from .schemas.api_schemas import (
-    ComparePhotosRequest,
+    CacheStatsResponse,
     ComparePhotosResponse,
-    ComparePhotosUploadRequest,
     CompareRequest,
+    CompareRequestPacked,
     CompareResponse,
     EmbedRequest,
     EmbedResponse,
+    ErrorCode,
     ErrorResponse,
     HealthResponse,
     ModelInfoResponse,
 )
-from .utils.embedding_utils import calculate_distance, distance_to_similarity, find_best_match
-from .utils.image_utils import ImageProcessingError, decode_base64_image, fetch_image_from_url, preprocess_image
+from .utils.embedding_utils import Gallery, calculate_distance, distance_to_similarity, find_best_match
+from .utils.image_utils import (
+    ImageProcessingError,
+    decode_base64_image,
+    create_async_http_client,
+    decode_image_bytes,
+    fetch_image_bytes_async,
+    preprocess_image,
+)
+
+# Match threshold per supported distance metric; looked up once per request
+_MATCH_THRESHOLDS = {
+    "cosine": settings.cosine_match_threshold,
+    "euclidean": settings.euclidean_match_threshold,
+}
+
+# Model loaded at startup; bound once in lifespan since it never changes while serving
+_model: Optional[FaceRecognitionModel] = None
 
 # Configure logging
 logging.basicConfig(
@@ -45,12 +67,19 @@ async def lifespan(app: FastAPI):
     """
     Lifespan context manager for application startup and shutdown.
 
-    Loads the face recognition model at startup and cleans up at shutdown.
+    Loads the face recognition model and opens the shared HTTP client at
+    startup, and cleans up at shutdown.
     """
+    global _model
+
     # Startup
     logger.info("Starting up face recognition service...")
     try:
         initialize_model()
+        _model = get_model()
+        app.state.http_client = create_async_http_client()
+        if settings.batching_enabled:
+            await embedding_batcher.start()
         logger.info("Service started successfully")
     except Exception as e:
         logger.error(f"Failed to start service: {str(e)}")
@@ -60,6 +89,11 @@ async def lifespan(app: FastAPI):
 
     # Shutdown
     logger.info("Shutting down face recognition service...")
+    await embedding_batcher.stop()
+    await app.state.http_client.aclose()
+    embedding_cache.clear()
+    image_url_cache.clear()
+    _model = None
     cleanup_model()
     logger.info("Service shut down successfully")
 
@@ -70,6 +104,7 @@ app = FastAPI(
     version=settings.app_version,
     description="Stateless face recognition microservice for embedding extraction and comparison",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # Add CORS middleware
@@ -109,6 +144,144 @@ async def image_processing_error_handler(request, exc: ImageProcessingError):
     )
 
 
+# Catch-all for unexpected errors, so handlers need no try/except of their own
+# (HTTPException and validation errors keep FastAPI's default handlers)
+@app.exception_handler(Exception)
+async def unexpected_error_handler(request, exc: Exception):
+    """Handle unexpected exceptions as 500 Internal Server Error."""
+    logger.exception(f"Unexpected error during {request.method} {request.url.path}")
+    return JSONResponse(
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        content=ErrorResponse(
+            error="Internal server error",
+            detail=str(exc),
+            error_code=ErrorCode.PROCESSING_ERROR
+        ).model_dump(),
+    )
+
+
+async def _read_upload(upload: UploadFile) -> bytes:
+    """
+    Read an uploaded image, refusing oversized files before loading them.
+
+    The multipart parser records each upload's size while spooling it to a
+    temporary file, so files over the size limit are rejected without
+    reading them into memory.
+
+    Args:
+        upload: Uploaded image file
+
+    Returns:
+        Raw (still encoded) image bytes
+
+    Raises:
+        ImageProcessingError: If the file exceeds the configured size limit
+    """
+    if upload.size is not None and upload.size > settings.max_image_size:
+        raise ImageProcessingError(
+            f"Image size ({upload.size} bytes) exceeds maximum allowed "
+            f"({settings.max_image_size} bytes)",
+            ErrorCode.IMAGE_TOO_LARGE
+        )
+    return await upload.read()
+
+
+async def _embed_image(image: np.ndarray) -> Tuple[np.ndarray, Optional[float]]:
+    """
+    Extract a face embedding from a preprocessed image on the inference pool.
+
+    Goes through the micro-batcher when batching is enabled.
+
+    Args:
+        image: Preprocessed image as numpy array (BGR format)
+
+    Returns:
+        Tuple of (embedding, detection_score)
+    """
+    if settings.batching_enabled:
+        return await embedding_batcher.submit(image)
+    return await _model.get_embedding_async(image, return_detection_info=True)
+
+
+async def _get_embedding_cached(
+    cache_key: bytes,
+    load_image: Callable[[], np.ndarray],
+) -> Tuple[np.ndarray, Optional[float]]:
+    """
+    Extract a face embedding, reusing the cached result for repeated images.
+
+    Decoding runs in a worker thread and inference on the bounded inference
+    pool (through the micro-batcher when batching is enabled), so the event
+    loop stays free while the image is processed.
+
+    Args:
+        cache_key: Digest of the submitted image data (see EmbeddingCache.make_key)
+        load_image: Callable that decodes the image; only invoked on a cache miss
+
+    Returns:
+        Tuple of (embedding, detection_score)
+    """
+    cached = embedding_cache.get(cache_key)
+    if cached is not None:
+        logger.debug("Embedding cache hit")
+        return cached
+
+    image = await asyncio.to_thread(lambda: preprocess_image(load_image()))
+    embedding, detection_score = await _embed_image(image)
+    embedding_cache.put(cache_key, embedding, detection_score)
+
+    return embedding, detection_score
+
+
+async def _get_embeddings_cached(
+    images: List[Tuple[bytes, Callable[[], np.ndarray]]],
+) -> List[Tuple[np.ndarray, Optional[float]]]:
+    """
+    Extract face embeddings for several images with a single model call.
+
+    Cached images are served from the cache; the rest are decoded concurrently
+    in worker threads, and their faces are embedded by one batched
+    recognition-model pass (get_embeddings_batch). Identical images are only
+    processed once.
+
+    Args:
+        images: (cache_key, load_image) pairs, as for _get_embedding_cached()
+
+    Returns:
+        List with one (embedding, detection_score) tuple per image, in order
+
+    Raises:
+        FaceModelError: If any image has no acceptable face or inference fails
+        ImageProcessingError: If any image cannot be decoded
+    """
+    results: List[Optional[Tuple[np.ndarray, Optional[float]]]] = [
+        embedding_cache.get(key) for key, _ in images
+    ]
+
+    # Unique cache misses, in request order
+    pending = {}
+    for index, (key, load_image) in enumerate(images):
+        if results[index] is None:
+            pending.setdefault(key, load_image)
+
+    if pending:
+        decoded = await asyncio.gather(*(
+            asyncio.to_thread(lambda load=load_image: preprocess_image(load()))
+            for load_image in pending.values()
+        ))
+        if settings.batching_enabled:
+            computed = await asyncio.gather(*(embedding_batcher.submit(image) for image in decoded))
+        else:
+            computed = await run_inference(_model.get_embeddings_batch, list(decoded), True)
+
+        fresh = dict(zip(pending, computed))
+        for key, (embedding, detection_score) in fresh.items():
+            embedding_cache.put(key, embedding, detection_score)
+        results = [result or fresh[key] for result, (key, _) in zip(results, images)]
+
+    return results
+
+
 @app.get("/")
 async def root():
     """Root endpoint."""
@@ -135,13 +308,12 @@ async def health_check():
     Note:
         This endpoint does not require authentication for monitoring purposes
     """
-    model = get_model()
-    is_loaded = model.is_loaded()
+    is_loaded = _model.is_loaded()
 
     return HealthResponse(
         status="healthy" if is_loaded else "unhealthy",
         model_loaded=is_loaded,
-        model_name=model.model_name if is_loaded else None,
+        model_name=_model.model_name if is_loaded else None,
     )
 
 
@@ -161,8 +333,7 @@ async def model_info():
     Security:
         Requires valid Bearer token in Authorization header
     """
-    model = get_model()
-    info = model.get_model_info()
+    info = _model.get_model_info()
 
     return ModelInfoResponse(
         name=info["name"],
@@ -172,6 +343,25 @@ async def model_info():
     )
 
 
+@app.get(
+    f"{settings.api_v1_prefix}/cache-stats",
+    response_model=CacheStatsResponse,
+    tags=["Info"],
+    dependencies=[Depends(verify_token)],
+)
+async def cache_stats():
+    """
+    Get hit/miss statistics for the embedding cache.
+
+    Returns:
+        CacheStatsResponse with cache size and hit/miss counters
+
+    Security:
+        Requires valid Bearer token in Authorization header
+    """
+    return CacheStatsResponse(**embedding_cache.stats())
+
+
 @app.post(
     f"{settings.api_v1_prefix}/embed",
     response_model=EmbedResponse,
@@ -198,40 +388,69 @@ async def extract_embedding(request: EmbedRequest):
     Security:
         Requires valid Bearer token in Authorization header
     """
-    try:
-        # Decode image from base64
-        logger.debug("Decoding base64 image...")
-        image = decode_base64_image(request.image)
+    # Decode, preprocess and embed (skipped entirely for repeated images)
+    logger.debug("Extracting face embedding...")
+    embedding, detection_score = await _get_embedding_cached(
+        embedding_cache.make_key(request.image),
+        lambda: decode_base64_image(request.image),
+    )
+
+    logger.info(f"Successfully extracted embedding (size: {len(embedding)})")
+
+    # orjson encodes the float32 array directly, without a list of Python floats;
+    # model_construct skips re-validating values computed above
+    response = EmbedResponse.model_construct(
+        embedding=embedding,
+        face_detected=True,
+        detection_score=detection_score,
+    )
+    return ORJSONResponse(response.model_dump())
 
-        # Preprocess image
-        logger.debug("Preprocessing image...")
-        image = preprocess_image(image)
 
-        # Get model and extract embedding
-        logger.debug("Extracting face embedding...")
-        model = get_model()
-        embedding, detection_score = model.get_embedding(image, return_detection_info=True)
+@app.post(
+    f"{settings.api_v1_prefix}/embed-crop",
+    response_model=EmbedResponse,
+    tags=["Face Recognition"],
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(verify_token)],
+)
+async def extract_embedding_from_crop(request: EmbedRequest):
+    """
+    Extract face embedding from a pre-aligned face crop.
 
-        # Convert embedding to list
-        embedding_list = embedding.tolist()
+    This endpoint skips face detection and runs only the recognition model,
+    for callers that already produce aligned crops (e.g. a face tracker).
+    The image must be a 112x112 face aligned to the ArcFace template.
 
-        logger.info(f"Successfully extracted embedding (size: {len(embedding_list)})")
+    Args:
+        request: EmbedRequest with base64-encoded aligned face crop
 
-        return EmbedResponse(
-            embedding=embedding_list,
-            face_detected=True,
-            detection_score=detection_score,
-        )
+    Returns:
+        EmbedResponse with 512-dimensional embedding vector
+        (detection_score is null since no detection is run)
 
-    except (FaceModelError, ImageProcessingError):
-        # These are handled by custom exception handlers
-        raise
-    except Exception as e:
-        logger.error(f"Unexpected error during embedding extraction: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Internal server error: {str(e)}",
-        )
+    Raises:
+        HTTPException: If image processing or embedding extraction fails
+
+    Security:
+        Requires valid Bearer token in Authorization header
+    """
+    logger.debug("Decoding base64 face crop...")
+    face_crop = await asyncio.to_thread(
+        lambda: preprocess_image(decode_base64_image(request.image))
+    )
+
+    logger.debug("Extracting embedding from face crop...")
+    embedding = await run_inference(_model.get_embedding_from_crop, face_crop)
+
+    logger.info(f"Successfully extracted crop embedding (size: {len(embedding)})")
+
+    response = EmbedResponse.model_construct(
+        embedding=embedding,
+        face_detected=True,
+        detection_score=None,
+    )
+    return ORJSONResponse(response.model_dump())
 
 
 @app.post(
@@ -268,8 +487,9 @@ async def compare_embeddings(request: CompareRequest):
         # Find best match
         all_matches, best_match = find_best_match(
             query_embedding=request.query_embedding,
-            reference_embeddings=request.reference_embeddings,
+            gallery=Gallery.from_reference_embeddings(request.reference_embeddings),
             metric=request.distance_metric,
+            top_k=request.top_k,
         )
 
         logger.info(
@@ -277,7 +497,7 @@ async def compare_embeddings(request: CompareRequest):
             f"(distance: {best_match.distance:.4f}, similarity: {best_match.similarity:.4f})"
         )
 
-        return CompareResponse(
+        return CompareResponse.model_construct(
             matches=all_matches,
             best_match=best_match,
             distance_metric=request.distance_metric,
@@ -289,11 +509,70 @@ async def compare_embeddings(request: CompareRequest):
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e),
         )
-    except Exception as e:
-        logger.error(f"Unexpected error during comparison: {str(e)}")
+
+
+@app.post(
+    f"{settings.api_v1_prefix}/compare-packed",
+    response_model=CompareResponse,
+    tags=["Face Recognition"],
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(verify_token)],
+)
+async def compare_packed(request: CompareRequestPacked):
+    """
+    Compare a query embedding against a packed reference matrix.
+
+    Like /compare, but the references arrive as a single base64-encoded
+    (N, 512) float32, float16 or int8 matrix plus a list of IDs. The matrix
+    is scored directly in its packed form, without per-reference parsing.
+
+    Args:
+        request: CompareRequestPacked with query embedding, IDs and packed matrix
+
+    Returns:
+        CompareResponse with sorted matches and best match
+
+    Raises:
+        HTTPException: If comparison fails
+
+    Security:
+        Requires valid Bearer token in Authorization header
+    """
+    try:
+        logger.debug(
+            f"Comparing query embedding with {len(request.ids)} packed {request.dtype} references"
+        )
+
+        ids = np.array(request.ids, dtype=object)
+        if request.dtype == "float32":
+            gallery = Gallery(ids, request.matrix)
+        else:
+            gallery = Gallery.from_packed(ids, request.matrix, scale=request.scale)
+
+        # Find best match
+        all_matches, best_match = find_best_match(
+            query_embedding=request.query_embedding,
+            gallery=gallery,
+            metric=request.distance_metric,
+            top_k=request.top_k,
+        )
+
+        logger.info(
+            f"Best match: {best_match.id} "
+            f"(distance: {best_match.distance:.4f}, similarity: {best_match.similarity:.4f})"
+        )
+
+        return CompareResponse.model_construct(
+            matches=all_matches,
+            best_match=best_match,
+            distance_metric=request.distance_metric,
+        )
+
+    except ValueError as e:
+        logger.error(f"Validation error during packed comparison: {str(e)}")
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Internal server error: {str(e)}",
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
         )
 
 
@@ -329,85 +608,79 @@ async def compare_photos(
     Security:
         Requires valid Bearer token in Authorization header
     """
-    try:
-        # Validate image1 URL
-        if not image1 or not image1.strip():
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Image URL cannot be empty",
-            )
-
-        image1 = image1.strip()
-        if not image1.startswith(('http://', 'https://')):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Image URL must start with http:// or https://",
-            )
-
-        # Validate distance metric
-        if distance_metric.lower() not in ["cosine", "euclidean"]:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Distance metric must be 'cosine' or 'euclidean', got '{distance_metric}'",
-            )
-
-        logger.debug(f"Fetching first image from URL: {image1}")
-        # Fetch and process first image from URL
-        img1 = fetch_image_from_url(image1)
-        img1 = preprocess_image(img1)
-
-        # Get model and extract embedding from first image
-        model = get_model()
-        embedding1, detection_score1 = model.get_embedding(img1, return_detection_info=True)
-        logger.debug(f"First image processed (detection score: {detection_score1:.4f})")
-
-        logger.debug(f"Reading second image file: {image2.filename}")
-        # Read and process second image from upload
-        image2_bytes = await image2.read()
-        image2_b64 = base64.b64encode(image2_bytes).decode("utf-8")
-        img2 = decode_base64_image(image2_b64)
-        img2 = preprocess_image(img2)
-
-        # Extract embedding from second image
-        embedding2, detection_score2 = model.get_embedding(img2, return_detection_info=True)
-        logger.debug(f"Second image processed (detection score: {detection_score2:.4f})")
-
-        # Calculate distance between embeddings
-        logger.debug(f"Calculating {distance_metric} distance...")
-        distance = calculate_distance(embedding1, embedding2, metric=distance_metric.lower())
-
-        # Convert distance to similarity
-        similarity = distance_to_similarity(distance, metric=distance_metric.lower())
-
-        # Determine if it's a match based on configurable thresholds
-        if distance_metric.lower() == "cosine":
-            is_match = distance < settings.cosine_match_threshold
-        else:  # euclidean
-            is_match = distance < settings.euclidean_match_threshold
-
-        logger.info(
-            f"Comparison complete: match={is_match}, "
-            f"similarity={similarity:.4f}, distance={distance:.4f}"
+    # Validate image1 URL
+    if not image1 or not image1.strip():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Image URL cannot be empty",
         )
 
-        return ComparePhotosResponse(
-            match=is_match,
-            similarity=similarity,
-            distance=distance,
-            distance_metric=distance_metric.lower(),
-            image1_detection_score=detection_score1,
-            image2_detection_score=detection_score2,
+    image1 = image1.strip()
+    if not image1.startswith(('http://', 'https://')):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Image URL must start with http:// or https://",
         )
 
-    except (FaceModelError, ImageProcessingError):
-        # These are handled by custom exception handlers
-        raise
-    except Exception as e:
-        logger.error(f"Unexpected error during photo comparison: {str(e)}")
+    # Validate distance metric
+    metric = distance_metric.lower()
+    match_threshold = _MATCH_THRESHOLDS.get(metric)
+    if match_threshold is None:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Internal server error: {str(e)}",
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Distance metric must be 'cosine' or 'euclidean', got '{distance_metric}'",
+        )
+
+    logger.debug(f"Reading second image file: {image2.filename}")
+    image2_bytes = await _read_upload(image2)
+
+    # Revalidate the first image if its embedding is cached for this URL
+    logger.debug(f"Fetching first image from URL: {image1}")
+    cached_url = image_url_cache.get(image1)
+    image1_bytes, validators = await fetch_image_bytes_async(
+        image1, app.state.http_client, cached_url[0] if cached_url else None
+    )
+
+    if image1_bytes is None:
+        logger.debug("First image not modified, reusing its cached embedding")
+        _, embedding1, detection_score1 = cached_url
+        embedding2, detection_score2 = await _get_embedding_cached(
+            embedding_cache.make_key(image2_bytes), lambda: decode_image_bytes(image2_bytes)
         )
+    else:
+        # Decode both images concurrently and embed them in one model call
+        (embedding1, detection_score1), (embedding2, detection_score2) = await _get_embeddings_cached([
+            (embedding_cache.make_key(image1_bytes), lambda: decode_image_bytes(image1_bytes)),
+            (embedding_cache.make_key(image2_bytes), lambda: decode_image_bytes(image2_bytes)),
+        ])
+        image_url_cache.put(image1, validators, embedding1, detection_score1)
+    logger.debug(
+        f"Images processed (detection scores: {detection_score1:.4f}, {detection_score2:.4f})"
+    )
+
+    # Calculate distance between embeddings
+    logger.debug(f"Calculating {metric} distance...")
+    distance = calculate_distance(embedding1, embedding2, metric=metric)
+
+    # Convert distance to similarity
+    similarity = distance_to_similarity(distance, metric=metric)
+
+    # Determine if it's a match based on configurable thresholds
+    is_match = distance < match_threshold
+
+    logger.info(
+        f"Comparison complete: match={is_match}, "
+        f"similarity={similarity:.4f}, distance={distance:.4f}"
+    )
+
+    return ComparePhotosResponse.model_construct(
+        match=is_match,
+        similarity=similarity,
+        distance=distance,
+        distance_metric=metric,
+        image1_detection_score=detection_score1,
+        image2_detection_score=detection_score2,
+    )
 
 
 @app.post(
@@ -426,7 +699,7 @@ async def compare_photos_upload(
     Compare two photos using file upload (convenient for testing in Swagger UI).
 
     This endpoint is designed for easy testing via the interactive API documentation.
-    It accepts file uploads directly and converts them to base64 internally.
+    It accepts file uploads directly and decodes the raw file bytes.
 
     For programmatic API usage, prefer the /compare-photos endpoint which accepts
     base64-encoded images in JSON format.
@@ -445,92 +718,74 @@ async def compare_photos_upload(
     Security:
         Requires valid Bearer token in Authorization header
     """
-    try:
-        # Validate distance metric
-        if distance_metric.lower() not in ["cosine", "euclidean"]:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Distance metric must be 'cosine' or 'euclidean', got '{distance_metric}'",
-            )
-
-        # Read and encode first image
-        logger.debug(f"Reading first image: {image1.filename}")
-        image1_bytes = await image1.read()
-        image1_b64 = base64.b64encode(image1_bytes).decode("utf-8")
-
-        # Read and encode second image
-        logger.debug(f"Reading second image: {image2.filename}")
-        image2_bytes = await image2.read()
-        image2_b64 = base64.b64encode(image2_bytes).decode("utf-8")
-
-        # Create request object
-        request = ComparePhotosUploadRequest(
-            image1=image1_b64,
-            image2=image2_b64,
-            distance_metric=distance_metric.lower(),
+    # Validate distance metric
+    metric = distance_metric.lower()
+    match_threshold = _MATCH_THRESHOLDS.get(metric)
+    if match_threshold is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Distance metric must be 'cosine' or 'euclidean', got '{distance_metric}'",
         )
 
-        # Process using the same logic as compare_photos
-        logger.debug("Processing first image...")
-        img1 = decode_base64_image(request.image1)
-        img1 = preprocess_image(img1)
-
-        model = get_model()
-        embedding1, detection_score1 = model.get_embedding(img1, return_detection_info=True)
-        logger.debug(f"First image processed (detection score: {detection_score1:.4f})")
-
-        logger.debug("Processing second image...")
-        img2 = decode_base64_image(request.image2)
-        img2 = preprocess_image(img2)
-
-        embedding2, detection_score2 = model.get_embedding(img2, return_detection_info=True)
-        logger.debug(f"Second image processed (detection score: {detection_score2:.4f})")
+    # Read first image
+    logger.debug(f"Reading first image: {image1.filename}")
+    image1_bytes = await _read_upload(image1)
+
+    # Read second image
+    logger.debug(f"Reading second image: {image2.filename}")
+    image2_bytes = await _read_upload(image2)
+
+    # Decode both images concurrently (raw bytes, no base64 round-trip)
+    # and embed them in one model call
+    logger.debug("Processing images...")
+    (embedding1, detection_score1), (embedding2, detection_score2) = await _get_embeddings_cached([
+        (embedding_cache.make_key(image1_bytes), lambda: decode_image_bytes(image1_bytes)),
+        (embedding_cache.make_key(image2_bytes), lambda: decode_image_bytes(image2_bytes)),
+    ])
+    logger.debug(
+        f"Images processed (detection scores: {detection_score1:.4f}, {detection_score2:.4f})"
+    )
 
-        # Calculate distance
-        logger.debug(f"Calculating {request.distance_metric} distance...")
-        distance = calculate_distance(embedding1, embedding2, metric=request.distance_metric)
+    # Calculate distance
+    logger.debug(f"Calculating {metric} distance...")
+    distance = calculate_distance(embedding1, embedding2, metric=metric)
 
-        # Convert to similarity
-        similarity = distance_to_similarity(distance, metric=request.distance_metric)
+    # Convert to similarity
+    similarity = distance_to_similarity(distance, metric=metric)
 
-        # Determine match
-        if request.distance_metric == "cosine":
-            is_match = distance < settings.cosine_match_threshold
-        else:  # euclidean
-            is_match = distance < settings.euclidean_match_threshold
+    # Determine match
+    is_match = distance < match_threshold
 
-        logger.info(
-            f"Upload comparison complete: match={is_match}, "
-            f"similarity={similarity:.4f}, distance={distance:.4f}"
-        )
-
-        return ComparePhotosResponse(
-            match=is_match,
-            similarity=similarity,
-            distance=distance,
-            distance_metric=request.distance_metric,
-            image1_detection_score=detection_score1,
-            image2_detection_score=detection_score2,
-        )
+    logger.info(
+        f"Upload comparison complete: match={is_match}, "
+        f"similarity={similarity:.4f}, distance={distance:.4f}"
+    )
 
-    except (FaceModelError, ImageProcessingError):
-        # These are handled by custom exception handlers
-        raise
-    except Exception as e:
-        logger.error(f"Unexpected error during upload comparison: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Internal server error: {str(e)}",
-        )
+    return ComparePhotosResponse.model_construct(
+        match=is_match,
+        similarity=similarity,
+        distance=distance,
+        distance_metric=metric,
+        image1_detection_score=detection_score1,
+        image2_detection_score=detection_score2,
+    )
 
 
 if __name__ == "__main__":
+    import os
+
     import uvicorn
 
+    # Each worker process loads its own model; reload mode only supports one
+    workers = 1 if settings.debug else settings.workers or os.cpu_count() or 1
+
     uvicorn.run(
         "face_recognition_service.main:app",
         host=settings.host,
         port=settings.port,
         reload=settings.debug,
+        workers=workers,
+        loop="auto",  # uvloop when installed (uvicorn[standard], non-Windows)
+        http="httptools",
         log_level=settings.log_level,
     )
@@ -1,15 +1,23 @@
 """Face recognition model loading and inference using InsightFace."""
 
+import asyncio
+import contextlib
+import functools
 import logging
 import os
-from typing import Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterator, List, Optional, Tuple, Union
 
 import cv2
 import numpy as np
+import onnxruntime as ort
 from insightface.app import FaceAnalysis
+from insightface.app.common import Face
+from insightface.utils import face_align
 
 from ..config import settings
 from ..schemas.api_schemas import ErrorCode
+from ..utils._kernels import warmup_kernels
 
 logger = logging.getLogger(__name__)
 
@@ -23,12 +31,98 @@ class FaceModelError(Exception):
         super().__init__(self.message)
 
 
+def _build_session_options() -> ort.SessionOptions:
+    """
+    Build the ONNX Runtime session options used for all InsightFace models.
+
+    Returns:
+        SessionOptions with full graph optimization, sequential execution,
+        denormals flushed to zero and the configured intra-op thread count
+    """
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+    if settings.ort_intra_op_threads > 0:
+        options.intra_op_num_threads = settings.ort_intra_op_threads
+    # Denormal floats are orders of magnitude slower on x86 and irrelevant to accuracy here
+    options.add_session_config_entry("session.set_denormal_as_zero", "1")
+    return options
+
+
+def _optimized_model_path(model_path: str, cache_dir: str) -> str:
+    """Path of the cached optimized copy of an ONNX model (keyed by model pack, file and ORT version)."""
+    pack = os.path.basename(os.path.dirname(model_path))
+    stem = os.path.splitext(os.path.basename(model_path))[0]
+    return os.path.join(cache_dir, f"{pack}_{stem}.ort-{ort.__version__}.onnx")
+
+
+@contextlib.contextmanager
+def _tuned_inference_sessions(cache_dir: Optional[str]) -> Iterator[None]:
+    """
+    Inject tuned SessionOptions into every InferenceSession created in the block.
+
+    FaceAnalysis does not expose SessionOptions, so InferenceSession.__init__
+    (which InsightFace's PickableInferenceSession calls) is patched for the
+    duration of model construction and restored afterwards.
+
+    When cache_dir is set, the graph-optimized model is written there on first
+    load and loaded with optimizations disabled on later loads, skipping graph
+    optimization on restart. Only use this with the CPU provider: optimized
+    graphs may contain provider- and hardware-specific nodes.
+
+    Args:
+        cache_dir: Directory for optimized models, or None to disable caching
+    """
+    original_init = ort.InferenceSession.__init__
+
+    def patched_init(session, path_or_bytes, sess_options=None, *args, **kwargs):
+        if sess_options is not None or not isinstance(path_or_bytes, str):
+            original_init(session, path_or_bytes, sess_options, *args, **kwargs)
+            return
+
+        options = _build_session_options()
+        if cache_dir is None:
+            original_init(session, path_or_bytes, options, *args, **kwargs)
+            return
+
+        cached_path = _optimized_model_path(path_or_bytes, cache_dir)
+        if (
+            os.path.exists(cached_path)
+            and os.path.getmtime(cached_path) >= os.path.getmtime(path_or_bytes)
+        ):
+            options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_DISABLE_ALL
+            try:
+                original_init(session, cached_path, options, *args, **kwargs)
+                logger.info(f"Loaded optimized model from cache: {cached_path}")
+                return
+            except Exception as e:
+                logger.warning(f"Ignoring unusable optimized model {cached_path}: {str(e)}")
+            options = _build_session_options()
+
+        # Write to a private file and rename, so concurrent workers never read a partial model
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f"{cached_path}.{os.getpid()}.tmp"
+        options.optimized_model_filepath = tmp_path
+        original_init(session, path_or_bytes, options, *args, **kwargs)
+        try:
+            os.replace(tmp_path, cached_path)
+        except OSError as e:
+            logger.warning(f"Could not cache optimized model {cached_path}: {str(e)}")
+
+    ort.InferenceSession.__init__ = patched_init
+    try:
+        yield
+    finally:
+        ort.InferenceSession.__init__ = original_init
+
+
 class FaceRecognitionModel:
     """Face recognition model wrapper using InsightFace."""
 
     def __init__(self):
         """Initialize the face recognition model."""
         self.model: Optional[FaceAnalysis] = None
+        self.recognition = None  # ArcFace sub-model, used directly for pre-aligned crops
         self.model_name: str = settings.model_name
         self.device: str = settings.device
         self.detection_threshold: float = settings.detection_threshold
@@ -55,12 +149,18 @@ class FaceRecognitionModel:
                 os.path.expanduser('~/.insightface')
             )
 
-            # Initialize FaceAnalysis
-            self.model = FaceAnalysis(
-                name=self.model_name,
-                root=insightface_root,
-                providers=settings.providers,
-            )
+            # Optimized graphs are provider-specific, so they are only cached for CPU
+            cache_dir = None
+            if settings.ort_optimized_model_cache and self.device == "cpu":
+                cache_dir = os.path.join(insightface_root, "ort_cache")
+
+            # Initialize FaceAnalysis (its ONNX sessions pick up the tuned options)
+            with _tuned_inference_sessions(cache_dir):
+                self.model = FaceAnalysis(
+                    name=self.model_name,
+                    root=insightface_root,
+                    providers=settings.providers,
+                )
 
             # Prepare model with detection size
             # ctx_id: -1 for CPU, 0 for GPU
@@ -73,6 +173,10 @@ class FaceRecognitionModel:
                 det_thresh=self.detection_threshold
             )
 
+            self.recognition = self.model.models.get("recognition")
+
+            self._warmup(det_size)
+
             logger.info("Face recognition model loaded successfully")
 
         except Exception as e:
@@ -80,6 +184,41 @@ class FaceRecognitionModel:
             logger.error(error_msg)
             raise FaceModelError(error_msg, ErrorCode.MODEL_NOT_LOADED)
 
+    def _warmup(self, det_size: Tuple[int, int]) -> None:
+        """
+        Run dummy forward passes through the detection and recognition models.
+
+        The first inference of an ONNX Runtime session pays for kernel selection,
+        memory arena growth and weight packing; doing it here keeps that cost out
+        of the first real request. The numba scoring kernels are compiled here
+        for the same reason. Failures are logged and otherwise ignored.
+
+        Args:
+            det_size: Detection input size (width, height)
+        """
+        if settings.warmup_iterations <= 0:
+            return
+
+        logger.info(f"Warming up model ({settings.warmup_iterations} iterations)...")
+        try:
+            warmup_kernels()
+        except Exception as e:
+            logger.warning(f"Distance kernel warmup failed: {str(e)}")
+
+        blank_image = np.zeros((det_size[1], det_size[0], 3), dtype=np.uint8)
+        recognition = self.recognition
+
+        for _ in range(settings.warmup_iterations):
+            try:
+                # A blank image yields no faces, so only the detector runs here
+                self.model.get(blank_image)
+                if recognition is not None:
+                    width, height = recognition.input_size
+                    recognition.get_feat(np.zeros((height, width, 3), dtype=np.uint8))
+            except Exception as e:
+                logger.warning(f"Model warmup pass failed: {str(e)}")
+                return
+
     def is_loaded(self) -> bool:
         """Check if the model is loaded."""
         return self.model is not None
@@ -93,6 +232,40 @@ class FaceRecognitionModel:
 
         return max(faces, key=lambda f: f.det_score * _area(f.bbox))
 
+    def _select_valid_face(self, faces):
+        """
+        Apply the quality gate and pick the dominant face.
+
+        Args:
+            faces: Faces returned by InsightFace detection
+
+        Returns:
+            The face with the highest det_score × area among faces meeting
+            settings.min_face_quality
+
+        Raises:
+            FaceModelError: If no face meets the quality threshold
+        """
+        # Filter to faces that meet the quality threshold
+        valid_faces = [
+            f for f in faces
+            if hasattr(f, 'det_score') and f.det_score >= settings.min_face_quality
+        ]
+
+        if not valid_faces:
+            detail = (
+                f"Best score was {max(f.det_score for f in faces):.2f}"
+                if faces else "no faces found"
+            )
+            raise FaceModelError(
+                f"No face met the quality threshold ({settings.min_face_quality}). {detail}. "
+                "Please use a clearer, well-lit, close-up photo.",
+                ErrorCode.NO_FACE_DETECTED
+            )
+
+        # Select the dominant face (highest det_score × face area)
+        return self._select_best_face(valid_faces)
+
     def get_embedding(
         self,
         image: np.ndarray,
@@ -123,25 +296,8 @@ class FaceRecognitionModel:
             # Detect faces
             faces = self.model.get(image)
 
-            # Filter to faces that meet the quality threshold
-            valid_faces = [
-                f for f in faces
-                if hasattr(f, 'det_score') and f.det_score >= settings.min_face_quality
-            ]
-
-            if not valid_faces:
-                detail = (
-                    f"Best score was {max(f.det_score for f in faces):.2f}"
-                    if faces else "no faces found"
-                )
-                raise FaceModelError(
-                    f"No face met the quality threshold ({settings.min_face_quality}). {detail}. "
-                    "Please use a clearer, well-lit, close-up photo.",
-                    ErrorCode.NO_FACE_DETECTED
-                )
-
-            # Select the dominant face (highest det_score × face area)
-            face = self._select_best_face(valid_faces)
+            # Select the dominant face among those meeting the quality threshold
+            face = self._select_valid_face(faces)
 
             # Extract embedding
             embedding = face.embedding
@@ -170,6 +326,193 @@ class FaceRecognitionModel:
                 ErrorCode.PROCESSING_ERROR
             )
 
+    def get_embedding_from_crop(self, face_crop: np.ndarray) -> np.ndarray:
+        """
+        Extract a face embedding from a pre-aligned face crop.
+
+        Skips face detection and landmark estimation entirely and runs only the
+        recognition model, so the crop must already be aligned the way InsightFace
+        aligns faces (ArcFace template, 112x112 for the bundled models).
+
+        Args:
+            face_crop: Aligned face crop as numpy array (BGR format)
+
+        Returns:
+            512-dimensional face embedding as numpy array
+
+        Raises:
+            FaceModelError: If model is not loaded, the crop has the wrong size,
+                or inference fails
+        """
+        if not self.is_loaded() or self.recognition is None:
+            raise FaceModelError(
+                "Face recognition model is not loaded",
+                ErrorCode.MODEL_NOT_LOADED
+            )
+
+        width, height = self.recognition.input_size
+        if face_crop.shape[:2] != (height, width):
+            raise FaceModelError(
+                f"Face crop must be {width}x{height}, "
+                f"got {face_crop.shape[1]}x{face_crop.shape[0]}",
+                ErrorCode.INVALID_IMAGE
+            )
+
+        try:
+            embedding = self.recognition.get_feat(face_crop).flatten()
+        except Exception as e:
+            logger.error(f"Error during crop embedding extraction: {str(e)}")
+            raise FaceModelError(
+                f"Failed to extract embedding: {str(e)}",
+                ErrorCode.PROCESSING_ERROR
+            )
+
+        if len(embedding) != self.embedding_size:
+            raise FaceModelError(
+                f"Invalid embedding extracted. Expected size {self.embedding_size}, "
+                f"got {len(embedding)}",
+                ErrorCode.INVALID_EMBEDDING
+            )
+
+        return embedding
+
+    def _detect(self, image: np.ndarray) -> List[Face]:
+        """
+        Run only the detector (no landmark or attribute models).
+
+        Args:
+            image: Input image as numpy array (BGR format)
+
+        Returns:
+            Detected faces with bbox, kps and det_score set
+        """
+        bboxes, kpss = self.model.det_model.detect(image, max_num=0, metric='default')
+        return [
+            Face(
+                bbox=bboxes[i, 0:4],
+                kps=kpss[i] if kpss is not None else None,
+                det_score=bboxes[i, 4],
+            )
+            for i in range(bboxes.shape[0])
+        ]
+
+    def get_embeddings_batch(
+        self,
+        images: List[np.ndarray],
+        return_detection_info: bool = True,
+        return_exceptions: bool = False
+    ) -> List[Union[Tuple[np.ndarray, Optional[float]], FaceModelError]]:
+        """
+        Extract face embeddings from several images with one recognition pass.
+
+        Detection runs per image (its input is image-size dependent), then the
+        aligned face crops of all images are stacked and embedded by a single
+        recognition-model inference call. Embeddings match get_embedding().
+
+        Args:
+            images: Input images as numpy arrays (BGR format)
+            return_detection_info: Whether to return detection scores
+            return_exceptions: If True, per-image failures are returned in place of
+                their result instead of raised
+
+        Returns:
+            List with one (embedding, detection_score) tuple per image, in order
+            (or a FaceModelError for failed images when return_exceptions is True)
+
+        Raises:
+            FaceModelError: If model is not loaded, or (unless return_exceptions is
+                True) if any image has no acceptable face or processing fails
+        """
+        if not self.is_loaded() or self.recognition is None:
+            raise FaceModelError(
+                "Face recognition model is not loaded",
+                ErrorCode.MODEL_NOT_LOADED
+            )
+
+        results: List = [None] * len(images)
+        crops: List[np.ndarray] = []
+        crop_indices: List[int] = []
+        crop_scores: List[float] = []
+        crop_size = self.recognition.input_size[0]
+
+        for index, image in enumerate(images):
+            try:
+                face = self._select_valid_face(self._detect(image))
+                crops.append(face_align.norm_crop(image, landmark=face.kps, image_size=crop_size))
+                crop_indices.append(index)
+                crop_scores.append(float(face.det_score))
+            except Exception as e:
+                if not isinstance(e, FaceModelError):
+                    logger.error(f"Error during face detection: {str(e)}")
+                    e = FaceModelError(
+                        f"Failed to extract embedding: {str(e)}",
+                        ErrorCode.PROCESSING_ERROR
+                    )
+                if not return_exceptions:
+                    raise e
+                results[index] = e
+
+        if crops:
+            try:
+                # One inference call for all crops
+                embeddings = self.recognition.get_feat(crops)
+            except Exception as e:
+                logger.error(f"Error during batched embedding extraction: {str(e)}")
+                raise FaceModelError(
+                    f"Failed to extract embedding: {str(e)}",
+                    ErrorCode.PROCESSING_ERROR
+                )
+
+            for index, embedding, score in zip(crop_indices, embeddings, crop_scores):
+                if len(embedding) != self.embedding_size:
+                    raise FaceModelError(
+                        f"Invalid embedding extracted. Expected size {self.embedding_size}, "
+                        f"got {len(embedding)}",
+                        ErrorCode.INVALID_EMBEDDING
+                    )
+                results[index] = (embedding, score if return_detection_info else None)
+
+        return results
+
+    async def get_embedding_async(
+        self,
+        image: np.ndarray,
+        return_detection_info: bool = True
+    ) -> Tuple[np.ndarray, Optional[float]]:
+        """
+        Extract face embedding without blocking the event loop.
+
+        Runs get_embedding() on the bounded inference thread pool.
+
+        Args:
+            image: Input image as numpy array (BGR format)
+            return_detection_info: Whether to return detection score
+
+        Returns:
+            Tuple of (embedding, detection_score), see get_embedding()
+
+        Raises:
+            FaceModelError: If model is not loaded, no face detected, or inference fails
+        """
+        return await run_inference(self.get_embedding, image, return_detection_info)
+
+    async def detect_faces_async(self, image: np.ndarray) -> int:
+        """
+        Count faces in an image without blocking the event loop.
+
+        Runs detect_faces() on the bounded inference thread pool.
+
+        Args:
+            image: Input image as numpy array (BGR format)
+
+        Returns:
+            Number of faces detected
+
+        Raises:
+            FaceModelError: If model is not loaded or detection fails
+        """
+        return await run_inference(self.detect_faces, image)
+
     def detect_faces(self, image: np.ndarray) -> int:
         """
         Detect the number of faces in an image without extracting embeddings.
@@ -220,6 +563,34 @@ class FaceRecognitionModel:
 # Global model instance (singleton pattern)
 _model_instance: Optional[FaceRecognitionModel] = None
 
+# Bounded thread pool for blocking ONNX inference calls
+_inference_executor: Optional[ThreadPoolExecutor] = None
+
+
+async def run_inference(func: Callable[..., Any], *args: Any) -> Any:
+    """
+    Run a blocking model call on the inference thread pool.
+
+    The pool is bounded by settings.inference_workers so concurrent requests
+    overlap decoding and I/O with inference without oversubscribing the CPU.
+
+    Args:
+        func: Blocking callable (typically a FaceRecognitionModel method)
+        *args: Positional arguments for func
+
+    Returns:
+        Whatever func returns
+    """
+    executor = _inference_executor
+    if executor is None:
+        raise FaceModelError(
+            "Face recognition model not initialized. Call initialize_model() first.",
+            ErrorCode.MODEL_NOT_LOADED
+        )
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, functools.partial(func, *args))
+
 
 def get_model() -> FaceRecognitionModel:
     """
@@ -251,11 +622,15 @@ def initialize_model() -> None:
     Raises:
         FaceModelError: If model loading fails
     """
-    global _model_instance
+    global _model_instance, _inference_executor
 
     logger.info("Initializing face recognition model...")
     _model_instance = FaceRecognitionModel()
     _model_instance.load()
+    _inference_executor = ThreadPoolExecutor(
+        max_workers=max(1, settings.inference_workers),
+        thread_name_prefix="inference",
+    )
     logger.info("Face recognition model initialized successfully")
 
 
@@ -265,7 +640,11 @@ def cleanup_model() -> None:
 
     This should be called at application shutdown.
     """
-    global _model_instance
+    global _model_instance, _inference_executor
+
+    if _inference_executor is not None:
+        _inference_executor.shutdown(wait=True)
+        _inference_executor = None
 
     if _model_instance is not None:
         logger.info("Cleaning up face recognition model...")
@@ -1,7 +1,90 @@
 """Pydantic schemas for API requests and responses."""
 
-from typing import Optional
-from pydantic import BaseModel, Field, field_validator
+import base64
+import binascii
+from typing import Annotated, Any, Literal, Optional
+
+import numpy as np
+from pydantic import (
+    BaseModel,
+    Field,
+    PlainSerializer,
+    PlainValidator,
+    PrivateAttr,
+    WithJsonSchema,
+    field_validator,
+    model_validator,
+)
+
+# Dimension of ArcFace embeddings
+EMBEDDING_SIZE = 512
+
+
+def _parse_embedding(value: Any) -> np.ndarray:
+    """
+    Parse an embedding from a list of floats or a base64-encoded binary buffer.
+
+    The binary form is the base64 encoding of 512 little-endian IEEE-754
+    float32 values (2048 bytes), e.g. ``base64.b64encode(arr.astype("<f4").tobytes())``,
+    which is wrapped with np.frombuffer without copying. Half-precision buffers
+    (512 float16 values, 1024 bytes) are also accepted and upcast to float32.
+    """
+    if isinstance(value, str):
+        try:
+            raw = base64.b64decode(value, validate=True)
+        except (binascii.Error, ValueError) as e:
+            raise ValueError(f"Invalid base64 embedding: {str(e)}")
+        if len(raw) == EMBEDDING_SIZE * 2:
+            return np.frombuffer(raw, dtype="<f2").astype(np.float32)
+        if len(raw) != EMBEDDING_SIZE * 4:
+            raise ValueError(
+                f"Binary embedding must be {EMBEDDING_SIZE * 4} bytes ({EMBEDDING_SIZE} float32 "
+                f"values) or {EMBEDDING_SIZE * 2} bytes (float16), got {len(raw)} bytes"
+            )
+        return np.frombuffer(raw, dtype="<f4")
+
+    if not isinstance(value, (list, tuple, np.ndarray)):
+        raise ValueError("Embedding must be a list of floats or a base64-encoded float32 buffer")
+
+    try:
+        array = np.asarray(value, dtype=np.float32)
+    except (TypeError, ValueError):
+        raise ValueError("Embedding must contain only numbers")
+
+    if array.shape != (EMBEDDING_SIZE,):
+        raise ValueError(f"Embedding must have {EMBEDDING_SIZE} values, got shape {array.shape}")
+    return array
+
+
+# 512-dimensional embedding accepted as a JSON list of floats or as base64 of raw
+# little-endian float32/float16, held as a float32 numpy array. JSON serialization
+# emits a list; python-mode model_dump() keeps the array for ORJSONResponse to encode
+Embedding = Annotated[
+    np.ndarray,
+    PlainValidator(_parse_embedding),
+    PlainSerializer(lambda array: array.tolist(), return_type=list[float], when_used="json"),
+    WithJsonSchema({
+        "anyOf": [
+            {
+                "type": "array",
+                "items": {"type": "number"},
+                "minItems": EMBEDDING_SIZE,
+                "maxItems": EMBEDDING_SIZE,
+            },
+            {
+                "type": "string",
+                "format": "byte",
+                "description": f"Base64 of {EMBEDDING_SIZE} little-endian float32 (or float16) values",
+            },
+        ]
+    }, mode="validation"),
+    WithJsonSchema({
+        "type": "array",
+        "items": {"type": "number"},
+        "minItems": EMBEDDING_SIZE,
+        "maxItems": EMBEDDING_SIZE,
+    }, mode="serialization"),
+]
 
 
 class EmbedRequest(BaseModel):
@@ -25,11 +108,9 @@ class EmbedRequest(BaseModel):
 class EmbedResponse(BaseModel):
     """Response schema for face embedding extraction."""
 
-    embedding: list[float] = Field(
+    embedding: Embedding = Field(
         ...,
-        description="Face embedding vector (512-dimensional)",
-        min_length=512,
-        max_length=512
+        description="Face embedding vector (512-dimensional)"
     )
     face_detected: bool = Field(
         ...,
@@ -51,22 +132,24 @@ class ReferenceEmbedding(BaseModel):
         description="Unique identifier for this embedding (e.g., user ID)",
         min_length=1
     )
-    embedding: list[float] = Field(
+    embedding: Embedding = Field(
         ...,
-        description="Face embedding vector (512-dimensional)",
-        min_length=512,
-        max_length=512
+        description=(
+            "Face embedding vector (512-dimensional), as a list of floats or "
+            "base64 of 512 little-endian float32 (or float16) values"
+        ),
     )
 
 
 class CompareRequest(BaseModel):
     """Request schema for comparing embeddings."""
 
-    query_embedding: list[float] = Field(
+    query_embedding: Embedding = Field(
         ...,
-        description="Query face embedding to compare (512-dimensional)",
-        min_length=512,
-        max_length=512
+        description=(
+            "Query face embedding to compare (512-dimensional), as a list of floats or "
+            "base64 of 512 little-endian float32 (or float16) values"
+        ),
     )
     reference_embeddings: list[ReferenceEmbedding] = Field(
         ...,
@@ -77,6 +160,11 @@ class CompareRequest(BaseModel):
         default="cosine",
         description="Distance metric to use: 'cosine' or 'euclidean'"
     )
+    top_k: Optional[int] = Field(
+        default=None,
+        description="Return only the k closest matches (default: all references)",
+        ge=1
+    )
 
     @field_validator("distance_metric")
     @classmethod
@@ -88,6 +176,85 @@ class CompareRequest(BaseModel):
         return v.lower()
 
 
+# Element types accepted for packed reference matrices
+_PACKED_DTYPES = {"float32": "<f4", "float16": "<f2", "int8": "i1"}
+
+
+class CompareRequestPacked(BaseModel):
+    """Request schema for comparing against a packed reference matrix."""
+
+    query_embedding: Embedding = Field(
+        ...,
+        description="Query face embedding to compare (512-dimensional)"
+    )
+    ids: list[str] = Field(
+        ...,
+        description="Reference identifiers, one per matrix row",
+        min_length=1
+    )
+    reference_matrix: str = Field(
+        ...,
+        description=(
+            "Base64 of the row-major (len(ids), 512) reference matrix "
+            "in little-endian `dtype` elements"
+        ),
+        min_length=1
+    )
+    dtype: Literal["float32", "float16", "int8"] = Field(
+        default="float16",
+        description="Element type of reference_matrix"
+    )
+    scale: float = Field(
+        default=1.0,
+        description="Quantization scale of int8 matrices (embedding = row / scale)",
+        gt=0.0
+    )
+    distance_metric: str = Field(
+        default="cosine",
+        description="Distance metric to use: 'cosine' or 'euclidean'"
+    )
+    top_k: Optional[int] = Field(
+        default=None,
+        description="Return only the k closest matches (default: all references)",
+        ge=1
+    )
+
+    _matrix: np.ndarray = PrivateAttr()
+
+    @field_validator("distance_metric")
+    @classmethod
+    def validate_metric(cls, v: str) -> str:
+        """Validate distance metric."""
+        allowed = {"cosine", "euclidean"}
+        if v.lower() not in allowed:
+            raise ValueError(f"Distance metric must be one of {allowed}")
+        return v.lower()
+
+    @model_validator(mode="after")
+    def decode_matrix(self) -> "CompareRequestPacked":
+        """Decode the reference matrix and check it has one 512-value row per ID."""
+        try:
+            raw = base64.b64decode(self.reference_matrix, validate=True)
+        except (binascii.Error, ValueError) as e:
+            raise ValueError(f"Invalid base64 reference matrix: {str(e)}")
+
+        dtype = np.dtype(_PACKED_DTYPES[self.dtype])
+        expected = len(self.ids) * EMBEDDING_SIZE * dtype.itemsize
+        if len(raw) != expected:
+            raise ValueError(
+                f"Reference matrix must be {expected} bytes ({len(self.ids)} x {EMBEDDING_SIZE} "
+                f"{self.dtype}), got {len(raw)} bytes"
+            )
+
+        self._matrix = np.frombuffer(raw, dtype=dtype).reshape(len(self.ids), EMBEDDING_SIZE)
+        return self
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """Decoded reference matrix of shape [len(ids), 512] (read-only view of the request body)."""
+        return self._matrix
+
+
 class MatchResult(BaseModel):
     """A single match result."""
 
@@ -106,7 +273,7 @@ class CompareResponse(BaseModel):
 
     matches: list[MatchResult] = Field(
         ...,
-        description="List of all matches sorted by distance (best first)"
+        description="Matches sorted by distance (best first); only the top_k closest if requested"
     )
     best_match: MatchResult = Field(
         ...,
@@ -135,79 +302,13 @@ class ModelInfoResponse(BaseModel):
     device: str = Field(..., description="Device used for inference (cpu/cuda)")
 
 
-class ComparePhotosRequest(BaseModel):
-    """Request schema for comparing two photos directly."""
+class CacheStatsResponse(BaseModel):
+    """Response schema for embedding cache statistics."""
 
-    image1: str = Field(
-        ...,
-        description="First image URL (http:// or https://)",
-        min_length=1
-    )
-    image2: str = Field(
-        ...,
-        description="Second image URL (http:// or https://)",
-        min_length=1
-    )
-    distance_metric: str = Field(
-        default="cosine",
-        description="Distance metric to use: 'cosine' or 'euclidean'"
-    )
-
-    @field_validator("image1", "image2")
-    @classmethod
-    def validate_url(cls, v: str) -> str:
-        """Validate that the image URL is not empty and has valid format."""
-        if not v or not v.strip():
-            raise ValueError("Image URL cannot be empty")
-        v = v.strip()
-        if not v.startswith(('http://', 'https://')):
-            raise ValueError("Image URL must start with http:// or https://")
-        return v
-
-    @field_validator("distance_metric")
-    @classmethod
-    def validate_metric(cls, v: str) -> str:
-        """Validate distance metric."""
-        allowed = {"cosine", "euclidean"}
-        if v.lower() not in allowed:
-            raise ValueError(f"Distance metric must be one of {allowed}")
-        return v.lower()
-
-
-class ComparePhotosUploadRequest(BaseModel):
-    """Request schema for comparing two photos via file upload (base64-encoded images)."""
-
-    image1: str = Field(
-        ...,
-        description="First image as base64-encoded string",
-        min_length=1
-    )
-    image2: str = Field(
-        ...,
-        description="Second image as base64-encoded string",
-        min_length=1
-    )
-    distance_metric: str = Field(
-        default="cosine",
-        description="Distance metric to use: 'cosine' or 'euclidean'"
-    )
-
-    @field_validator("image1", "image2")
-    @classmethod
-    def validate_base64(cls, v: str) -> str:
-        """Validate that the image data is not empty."""
-        if not v or not v.strip():
-            raise ValueError("Image data cannot be empty")
-        return v.strip()
-
-    @field_validator("distance_metric")
-    @classmethod
-    def validate_metric(cls, v: str) -> str:
-        """Validate distance metric."""
-        allowed = {"cosine", "euclidean"}
-        if v.lower() not in allowed:
-            raise ValueError(f"Distance metric must be one of {allowed}")
-        return v.lower()
+    size: int = Field(..., description="Number of cached embeddings")
+    max_size: int = Field(..., description="Maximum number of cached embeddings (0 = disabled)")
+    hits: int = Field(..., description="Number of cache hits since startup")
+    misses: int = Field(..., description="Number of cache misses since startup")
 
 
 class ComparePhotosResponse(BaseModel):
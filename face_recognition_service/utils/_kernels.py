@@ -0,0 +1,106 @@
+"""Numba-compiled scoring kernels for large embedding galleries."""
+
+import numpy as np
+from numba import njit, prange
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def cosine_similarities(references: np.ndarray, query_unit: np.ndarray, out: np.ndarray) -> None:
+    """
+    Compute cosine similarities between each reference row and a unit query.
+
+    Each row's dot product and squared norm are accumulated in the same pass,
+    so the (unnormalized) gallery is streamed from memory exactly once, with
+    rows split across threads.
+
+    Args:
+        references: float32 C-contiguous array of shape [num_refs, embedding_dim]
+        query_unit: L2-normalized float32 query of shape [embedding_dim]
+        out: float32 array of shape [num_refs] receiving the similarities
+    """
+    num_refs, dim = references.shape
+    for i in prange(num_refs):
+        dot = 0.0
+        sq_norm = 0.0
+        for k in range(dim):
+            value = references[i, k]
+            dot += value * query_unit[k]
+            sq_norm += value * value
+        out[i] = dot / np.sqrt(sq_norm) if sq_norm > 0.0 else 0.0
+
+
+@njit(fastmath=True, cache=True)
+def cosine_distance_f32(a: np.ndarray, b: np.ndarray) -> float:
+    """
+    Cosine distance between two contiguous float32 vectors of equal length.
+
+    The dot product and both squared norms are accumulated in one loop that
+    LLVM vectorizes. Zero vectors have distance 1.0, as in cosine_distance().
+
+    Args:
+        a: First embedding vector
+        b: Second embedding vector
+
+    Returns:
+        Cosine distance in [0, 2]
+    """
+    dot = np.float32(0.0)
+    sq_norm_a = np.float32(0.0)
+    sq_norm_b = np.float32(0.0)
+    for k in range(a.shape[0]):
+        dot += a[k] * b[k]
+        sq_norm_a += a[k] * a[k]
+        sq_norm_b += b[k] * b[k]
+    if sq_norm_a == 0.0 or sq_norm_b == 0.0:
+        return 1.0
+    similarity = dot / np.sqrt(np.float64(sq_norm_a) * np.float64(sq_norm_b))
+    return 1.0 - min(1.0, max(-1.0, similarity))
+
+
+@njit(fastmath=True, cache=True)
+def euclidean_distance_f32(a: np.ndarray, b: np.ndarray) -> float:
+    """
+    Euclidean distance between two contiguous float32 vectors of equal length.
+
+    Squared differences are accumulated directly, so identical vectors score
+    exactly 0 (no cancellation as in the dot-product identity).
+
+    Args:
+        a: First embedding vector
+        b: Second embedding vector
+
+    Returns:
+        Euclidean distance
+    """
+    sq_distance = np.float32(0.0)
+    for k in range(a.shape[0]):
+        diff = a[k] - b[k]
+        sq_distance += diff * diff
+    return np.sqrt(np.float64(sq_distance))
+
+
+def warmup_kernels(dim: int = 512) -> None:
+    """
+    Compile every kernel specialization the service dispatches to.
+
+    The kernels compile lazily on first call (or load from numba's on-disk
+    cache), which would otherwise happen inside the first scoring request.
+    Pairwise kernels are called on writable and read-only operands, since
+    cached embeddings are read-only and numba specializes on both.
+
+    Args:
+        dim: Embedding dimension of the dummy vectors
+    """
+    writable = np.ones(dim, dtype=np.float32)
+    read_only = writable.copy()
+    read_only.flags.writeable = False
+    for kernel in (cosine_distance_f32, euclidean_distance_f32):
+        for a in (writable, read_only):
+            for b in (writable, read_only):
+                kernel(a, b)
+
+    references = np.ones((2, dim), dtype=np.float32)
+    out = np.empty(2, dtype=np.float32)
+    cosine_similarities(references, writable, out)
+    references.flags.writeable = False
+    cosine_similarities(references, read_only, out)
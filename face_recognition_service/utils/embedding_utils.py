@@ -1,10 +1,84 @@
 """Embedding distance calculation and comparison utilities."""
 
-from typing import List, Tuple
+import math
+from typing import List, Optional, Tuple, Union
 
 import numpy as np
 
+from ..config import settings
 from ..schemas.api_schemas import MatchResult, ReferenceEmbedding
+from ._kernels import cosine_distance_f32, cosine_similarities, euclidean_distance_f32
+
+# Galleries larger than this are scored by the parallel numba kernel instead of BLAS
+_NUMBA_MIN_ROWS = 1024
+
+# Euclidean matches with ||r - q||^2 below this fraction of ||r||^2 + ||q||^2 are
+# recomputed directly, where the dot-product identity is dominated by rounding error
+_EUCLIDEAN_REFINE_RATIO = 1e-3
+
+# Rows upcast per tile when scoring a compressed (int8/fp16) gallery (keeps the fp32 copy cache-sized)
+_TILE_ROWS = 4096
+
+# Storage dtype of gallery embeddings per embedding_precision setting
+_GALLERY_DTYPES = {"fp32": np.float32, "fp16": np.float16}
+
+
+def _l2_normalize(x: np.ndarray, axis: int = -1) -> np.ndarray:
+    """
+    L2-normalize an array along an axis.
+
+    Zero vectors stay zero instead of producing NaN.
+
+    Args:
+        x: Array to normalize
+        axis: Axis along which to normalize (1 for the rows of a 2D matrix)
+
+    Returns:
+        New array with unit-norm slices along the axis
+    """
+    norms = np.linalg.norm(x, axis=axis, keepdims=True)
+    np.maximum(norms, 1e-12, out=norms)
+    return x / norms
+
+
+def _tiled_matvec(matrix: np.ndarray, vector: np.ndarray) -> np.ndarray:
+    """
+    Multiply a compressed matrix by a float32 vector, upcasting one tile at a time.
+
+    Only _TILE_ROWS rows are converted to float32 at once, so the matrix is
+    streamed at its compressed width and the fp32 copy stays in cache.
+
+    Args:
+        matrix: 2D array of shape [num_rows, dim] (e.g. float16 or int8)
+        vector: float32 vector of shape [dim]
+
+    Returns:
+        float32 array of shape [num_rows]
+    """
+    num_rows = matrix.shape[0]
+    result = np.empty(num_rows, dtype=np.float32)
+    for start in range(0, num_rows, _TILE_ROWS):
+        tile = matrix[start:start + _TILE_ROWS].astype(np.float32)
+        np.dot(tile, vector, out=result[start:start + tile.shape[0]])
+    return result
+
+
+def _tiled_row_sqnorms(matrix: np.ndarray) -> np.ndarray:
+    """
+    Squared L2 norm of each row of a compressed matrix, upcasting one tile at a time.
+
+    Args:
+        matrix: 2D array of shape [num_rows, dim] (e.g. float16 or int8)
+
+    Returns:
+        float32 array of shape [num_rows]
+    """
+    num_rows = matrix.shape[0]
+    result = np.empty(num_rows, dtype=np.float32)
+    for start in range(0, num_rows, _TILE_ROWS):
+        tile = matrix[start:start + _TILE_ROWS].astype(np.float32)
+        result[start:start + tile.shape[0]] = np.einsum("ij,ij->i", tile, tile)
+    return result
 
 
 def normalize_embedding(embedding: np.ndarray) -> np.ndarray:
@@ -37,26 +111,28 @@ def cosine_distance(embedding1: np.ndarray, embedding2: np.ndarray) -> float:
     Returns:
         Cosine distance as float
     """
-    # Normalize embeddings
-    emb1_norm = normalize_embedding(embedding1)
-    emb2_norm = normalize_embedding(embedding2)
+    # Three dot products, no normalized copies of the inputs
+    sq_norm1 = float(np.dot(embedding1, embedding1))
+    sq_norm2 = float(np.dot(embedding2, embedding2))
+    if sq_norm1 == 0.0 or sq_norm2 == 0.0:
+        return 1.0
 
-    # Calculate cosine similarity
-    cosine_sim = np.dot(emb1_norm, emb2_norm)
+    cosine_sim = float(np.dot(embedding1, embedding2)) / math.sqrt(sq_norm1 * sq_norm2)
 
     # Clip to handle numerical errors
-    cosine_sim = np.clip(cosine_sim, -1.0, 1.0)
+    cosine_sim = min(1.0, max(-1.0, cosine_sim))
 
     # Convert to distance (0 = identical, 2 = opposite)
-    distance = 1.0 - cosine_sim
-
-    return float(distance)
+    return 1.0 - cosine_sim
 
 
 def euclidean_distance(embedding1: np.ndarray, embedding2: np.ndarray) -> float:
     """
     Calculate Euclidean (L2) distance between two embeddings.
 
+    Uses ||a - b||^2 = ||a||^2 + ||b||^2 - 2 a.b so the difference vector
+    is never materialized.
+
     Args:
         embedding1: First embedding vector
         embedding2: Second embedding vector
@@ -64,9 +140,20 @@ def euclidean_distance(embedding1: np.ndarray, embedding2: np.ndarray) -> float:
     Returns:
         Euclidean distance as float
     """
-    diff = embedding1 - embedding2
-    distance = np.linalg.norm(diff)
-    return float(distance)
+    sq_distance = (
+        float(np.dot(embedding1, embedding1))
+        + float(np.dot(embedding2, embedding2))
+        - 2.0 * float(np.dot(embedding1, embedding2))
+    )
+    # Rounding can push the result of identical vectors slightly below zero
+    return math.sqrt(max(0.0, sq_distance))
+
+
+# Compiled float32 pairwise kernels used by calculate_distance, by metric
+_DISTANCE_KERNELS = {
+    "cosine": cosine_distance_f32,
+    "euclidean": euclidean_distance_f32,
+}
 
 
 def calculate_distance(
@@ -77,6 +164,10 @@ def calculate_distance(
     """
     Calculate distance between two embeddings using specified metric.
 
+    Dispatches to a numba-compiled float32 kernel; inputs are converted to
+    contiguous float32 only if they are not already, so at most one
+    specialization per writable/read-only combination is ever compiled.
+
     Args:
         embedding1: First embedding vector
         embedding2: Second embedding vector
@@ -86,15 +177,21 @@ def calculate_distance(
         Distance as float
 
     Raises:
-        ValueError: If metric is not supported
+        ValueError: If metric is not supported or the embeddings differ in shape
     """
-    if metric == "cosine":
-        return cosine_distance(embedding1, embedding2)
-    elif metric == "euclidean":
-        return euclidean_distance(embedding1, embedding2)
-    else:
+    kernel = _DISTANCE_KERNELS.get(metric)
+    if kernel is None:
         raise ValueError(f"Unsupported distance metric: {metric}")
 
+    array1 = np.ascontiguousarray(embedding1, dtype=np.float32)
+    array2 = np.ascontiguousarray(embedding2, dtype=np.float32)
+    if array1.ndim != 1 or array1.shape != array2.shape:
+        raise ValueError(
+            f"Embeddings must be 1D vectors of the same size, got {array1.shape} and {array2.shape}"
+        )
+
+    return kernel(array1, array2)
+
 
 def distance_to_similarity(distance: float, metric: str = "cosine") -> float:
     """
@@ -124,50 +221,178 @@ def distance_to_similarity(distance: float, metric: str = "cosine") -> float:
         raise ValueError(f"Unsupported distance metric: {metric}")
 
 
+class Gallery:
+    """
+    Reference embeddings stored as parallel arrays (structure of arrays).
+
+    Instead of a list of ReferenceEmbedding objects, the gallery keeps one
+    contiguous matrix of embeddings, an aligned array of IDs, and the per-row
+    squared and plain L2 norms, so scoring is a single sweep over contiguous
+    memory.
+
+    With fp16 precision the matrix is stored as float16 (half the memory and
+    bandwidth) and upcast to float32 tile by tile while scoring. Packed int8
+    galleries (see from_packed) are scored the same way; their rows hold the
+    embeddings multiplied by ``scale``.
+    """
+
+    __slots__ = ("ids", "embeddings", "scale", "sqnorms", "norms")
+
+    def __init__(self, ids: np.ndarray, embeddings: np.ndarray, precision: str = "fp32"):
+        """
+        Initialize the gallery.
+
+        Args:
+            ids: Object array of reference IDs, shape [num_refs]
+            embeddings: Reference embeddings, shape [num_refs, embedding_dim]
+            precision: Storage precision of the embedding matrix ('fp32' or 'fp16')
+
+        Raises:
+            ValueError: If precision is not supported
+        """
+        if precision not in _GALLERY_DTYPES:
+            raise ValueError(f"Unsupported embedding precision: {precision}")
+
+        matrix = np.ascontiguousarray(embeddings, dtype=np.float32)
+        self.ids = ids
+        # Norms come from the fp32 values; plain norms are clamped away from zero
+        # so zero rows score 0 instead of NaN
+        self.sqnorms = np.einsum("ij,ij->i", matrix, matrix)
+        self.norms = np.sqrt(self.sqnorms)
+        np.maximum(self.norms, 1e-12, out=self.norms)
+        self.embeddings = matrix.astype(_GALLERY_DTYPES[precision], copy=False)
+        self.scale = 1.0
+
+    @property
+    def is_compressed(self) -> bool:
+        """Check if embeddings are stored below float32 precision."""
+        return self.embeddings.dtype != np.float32
+
+    def __len__(self) -> int:
+        return self.embeddings.shape[0]
+
+    @classmethod
+    def from_matrix(cls, embeddings: np.ndarray) -> "Gallery":
+        """
+        Create an anonymous gallery (positional IDs) from an embedding matrix.
+
+        Args:
+            embeddings: Reference embeddings, shape [num_refs, embedding_dim]
+
+        Returns:
+            Gallery whose IDs are the row indices
+        """
+        return cls(np.arange(embeddings.shape[0]).astype(object), embeddings)
+
+    @classmethod
+    def from_packed(
+        cls,
+        ids: np.ndarray,
+        matrix: np.ndarray,
+        scale: float = 1.0
+    ) -> "Gallery":
+        """
+        Wrap an already-packed float16 or int8 matrix without an fp32 copy.
+
+        Args:
+            ids: Object array of reference IDs, shape [num_refs]
+            matrix: float16 or int8 array of shape [num_refs, embedding_dim]
+                holding the embeddings multiplied by scale
+            scale: Quantization scale of the matrix (embedding = row / scale)
+
+        Returns:
+            Gallery scored directly from the packed matrix
+
+        Raises:
+            ValueError: If the scale is not positive
+        """
+        if not scale > 0:
+            raise ValueError(f"Scale must be positive, got {scale}")
+
+        gallery = cls.__new__(cls)
+        gallery.ids = ids
+        gallery.embeddings = np.ascontiguousarray(matrix)
+        gallery.scale = float(scale)
+        gallery.sqnorms = _tiled_row_sqnorms(gallery.embeddings) / np.float32(scale * scale)
+        gallery.norms = np.sqrt(gallery.sqnorms)
+        np.maximum(gallery.norms, 1e-12, out=gallery.norms)
+        return gallery
+
+    @classmethod
+    def from_reference_embeddings(
+        cls,
+        reference_embeddings: List[ReferenceEmbedding],
+        precision: Optional[str] = None
+    ) -> "Gallery":
+        """
+        Stack reference embeddings into a gallery.
+
+        Args:
+            reference_embeddings: List of reference embeddings with IDs
+            precision: Storage precision ('fp32' or 'fp16'); defaults to settings.embedding_precision
+
+        Returns:
+            Gallery holding the IDs and a [num_refs, embedding_dim] matrix
+        """
+        ids = np.array([ref.id for ref in reference_embeddings], dtype=object)
+        embeddings = np.stack(
+            [np.asarray(ref.embedding, dtype=np.float32) for ref in reference_embeddings]
+        )
+        return cls(ids, embeddings, precision or settings.embedding_precision)
+
+
 def find_best_match(
-    query_embedding: List[float],
-    reference_embeddings: List[ReferenceEmbedding],
-    metric: str = "cosine"
+    query_embedding: Union[List[float], np.ndarray],
+    gallery: Gallery,
+    metric: str = "cosine",
+    top_k: Optional[int] = None,
 ) -> Tuple[List[MatchResult], MatchResult]:
     """
     Find the best matching reference embedding for a query embedding.
 
+    All references are scored at once with batch_calculate_distances (a
+    single matrix-vector product) instead of one distance call per reference.
+    With top_k, only the k closest references are selected (argpartition)
+    and sorted, and MatchResult objects are built for those alone.
+
     Args:
-        query_embedding: Query embedding vector (512-dimensional list)
-        reference_embeddings: List of reference embeddings with IDs
+        query_embedding: Query embedding vector (512-dimensional list or array)
+        gallery: Reference embeddings with IDs
         metric: Distance metric to use ('cosine' or 'euclidean')
+        top_k: Number of closest matches to return (None returns all)
 
     Returns:
-        Tuple of (all_matches, best_match) where:
-        - all_matches: List of all MatchResult objects sorted by distance (ascending)
+        Tuple of (matches, best_match) where:
+        - matches: List of MatchResult objects sorted by distance (ascending),
+          all references or the top_k closest
         - best_match: The best matching MatchResult (lowest distance)
+
+    Raises:
+        ValueError: If metric is not supported
     """
     # Convert query embedding to numpy array
-    query_array = np.array(query_embedding, dtype=np.float32)
-
-    # Calculate distances to all references
-    matches: List[MatchResult] = []
-
-    for ref in reference_embeddings:
-        # Convert reference embedding to numpy array
-        ref_array = np.array(ref.embedding, dtype=np.float32)
+    query_array = np.asarray(query_embedding, dtype=np.float32)
 
-        # Calculate distance
-        distance = calculate_distance(query_array, ref_array, metric=metric)
+    # Score all references with a single matrix-vector product
+    distances = batch_calculate_distances(query_array, gallery, metric=metric)
 
-        # Convert to similarity
-        similarity = distance_to_similarity(distance, metric=metric)
+    # Sort by distance (ascending - lower is better); stable to keep input order on ties
+    if top_k is not None and top_k < len(distances):
+        candidates = np.argpartition(distances, top_k - 1)[:top_k]
+        order = candidates[np.lexsort((candidates, distances[candidates]))]
+    else:
+        order = np.argsort(distances, kind="stable")
 
-        # Create match result
-        match = MatchResult(
-            id=ref.id,
-            distance=distance,
-            similarity=similarity
+    # Values are computed here, so skip validating each MatchResult
+    matches: List[MatchResult] = []
+    for ref_id, distance in zip(gallery.ids[order], distances[order].tolist()):
+        matches.append(
+            MatchResult.model_construct(
+                id=ref_id,
+                distance=distance,
+                similarity=distance_to_similarity(distance, metric=metric)
+            )
         )
-        matches.append(match)
-
-    # Sort by distance (ascending - lower is better)
-    matches.sort(key=lambda x: x.distance)
 
     # Best match is the first one (lowest distance)
     best_match = matches[0]
@@ -177,7 +402,7 @@ def find_best_match(
 
 def batch_calculate_distances(
     query_embedding: np.ndarray,
-    reference_embeddings: np.ndarray,
+    reference_embeddings: Union[Gallery, np.ndarray],
     metric: str = "cosine"
 ) -> np.ndarray:
     """
@@ -185,19 +410,35 @@ def batch_calculate_distances(
 
     Args:
         query_embedding: Query embedding (1D array of shape [embedding_dim])
-        reference_embeddings: Reference embeddings (2D array of shape [num_refs, embedding_dim])
+        reference_embeddings: Gallery, or a 2D array of shape [num_refs, embedding_dim]
         metric: Distance metric ('cosine' or 'euclidean')
 
     Returns:
         Array of distances (1D array of shape [num_refs])
     """
-    if metric == "cosine":
-        # Normalize embeddings
-        query_norm = normalize_embedding(query_embedding)
-        refs_norm = normalize_embedding(reference_embeddings)
+    if isinstance(reference_embeddings, Gallery):
+        gallery = reference_embeddings
+    else:
+        gallery = Gallery.from_matrix(reference_embeddings)
 
-        # Calculate cosine similarities (vectorized)
-        cosine_sims = np.dot(refs_norm, query_norm)
+    if metric == "cosine":
+        # Normalize the query; reference rows are divided by their own norms
+        query_norm = _l2_normalize(query_embedding, axis=0).astype(np.float32)
+
+        if gallery.is_compressed:
+            # Upcast tile by tile; BLAS still runs at fp32
+            cosine_sims = _tiled_matvec(gallery.embeddings, query_norm)
+            cosine_sims /= gallery.norms * np.float32(gallery.scale)
+        elif len(gallery) > _NUMBA_MIN_ROWS:
+            # Large galleries are memory-bound: normalize and score each row in
+            # one pass, spread across cores, without a normalized copy
+            cosine_sims = np.empty(len(gallery), dtype=np.float32)
+            cosine_similarities(gallery.embeddings, query_norm, cosine_sims)
+        else:
+            # Calculate cosine similarities (vectorized)
+            cosine_sims = np.dot(gallery.embeddings, query_norm)
+            cosine_sims /= gallery.norms
+        np.clip(cosine_sims, -1.0, 1.0, out=cosine_sims)
 
         # Convert to distances
         distances = 1.0 - cosine_sims
@@ -206,8 +447,34 @@ def batch_calculate_distances(
 
     elif metric == "euclidean":
         # Calculate Euclidean distances (vectorized)
-        diffs = reference_embeddings - query_embedding
-        distances = np.linalg.norm(diffs, axis=1)
+        query_array = np.asarray(query_embedding, dtype=np.float32)
+
+        if gallery.is_compressed:
+            # Upcast tile by tile instead of materializing an fp32 copy of the gallery;
+            # differences are taken explicitly because fp16 rounding would dominate
+            # the cancellation in the dot-product identity below for close matches
+            distances = np.empty(len(gallery), dtype=np.float32)
+            for start in range(0, len(gallery), _TILE_ROWS):
+                tile = gallery.embeddings[start:start + _TILE_ROWS].astype(np.float32)
+                if gallery.scale != 1.0:
+                    tile /= np.float32(gallery.scale)
+                tile -= query_array
+                distances[start:start + tile.shape[0]] = np.linalg.norm(tile, axis=1)
+            return distances
+
+        # ||r - q||^2 = ||r||^2 + ||q||^2 - 2 r.q: one matrix-vector product,
+        # no [num_refs, embedding_dim] difference matrix
+        squared = np.dot(gallery.embeddings, query_array)
+        squared *= -2.0
+        magnitudes = gallery.sqnorms + float(np.dot(query_array, query_array))
+        squared += magnitudes
+        np.maximum(squared, 0.0, out=squared)
+
+        # Near-duplicates lose their digits to cancellation; recompute those few exactly
+        close = np.flatnonzero(squared < _EUCLIDEAN_REFINE_RATIO * magnitudes)
+        distances = np.sqrt(squared, out=squared)
+        if close.size:
+            distances[close] = np.linalg.norm(gallery.embeddings[close] - query_array, axis=1)
 
         return distances
 
@@ -215,12 +482,74 @@ def batch_calculate_distances(
         raise ValueError(f"Unsupported distance metric: {metric}")
 
 
-def is_valid_embedding(embedding: List[float], expected_size: int = 512) -> bool:
+def quantize_gallery(reference_embeddings: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Quantize reference embeddings to int8 for cosine scoring.
+
+    Rows are L2-normalized first, then scaled symmetrically (zero-point 0)
+    so that the largest absolute component maps to 127.
+
+    Args:
+        reference_embeddings: Reference embeddings (2D array of shape [num_refs, embedding_dim])
+
+    Returns:
+        Tuple of (quantized, scales) where:
+        - quantized: int8 array of shape [num_refs, embedding_dim]
+        - scales: float32 array of shape [num_refs]; quantized / scale recovers the unit row
+    """
+    matrix = _l2_normalize(
+        np.atleast_2d(np.asarray(reference_embeddings, dtype=np.float32)), axis=1
+    )
+
+    max_abs = np.abs(matrix).max(axis=1)
+    max_abs[max_abs == 0] = 1.0
+    scales = (127.0 / max_abs).astype(np.float32)
+
+    quantized = np.round(matrix * scales[:, None]).astype(np.int8)
+    return quantized, scales
+
+
+def quantized_cosine_distances(
+    query_embedding: np.ndarray,
+    quantized_references: np.ndarray,
+    reference_scales: np.ndarray
+) -> np.ndarray:
+    """
+    Calculate cosine distances between a query and an int8-quantized gallery.
+
+    The query is quantized the same way as the gallery. int8 x int8 products
+    summed over 512 dimensions stay below 2**24, so the dot products are exact
+    when evaluated by float32 BLAS on tiles of upcast rows.
+
+    Args:
+        query_embedding: Query embedding (1D array of shape [embedding_dim])
+        quantized_references: Output of quantize_gallery (int8, [num_refs, embedding_dim])
+        reference_scales: Per-row scales from quantize_gallery ([num_refs])
+
+    Returns:
+        Array of cosine distances (1D array of shape [num_refs])
+    """
+    quantized_query, query_scale = quantize_gallery(query_embedding)
+    query_vector = quantized_query[0].astype(np.float32)
+
+    dots = _tiled_matvec(quantized_references, query_vector)
+
+    cosine_sims = dots / (query_scale[0] * reference_scales)
+    np.clip(cosine_sims, -1.0, 1.0, out=cosine_sims)
+    return 1.0 - cosine_sims
+
+
+def is_valid_embedding(
+    embedding: Union[List[float], np.ndarray],
+    expected_size: int = 512
+) -> bool:
     """
     Validate that an embedding has the correct size and valid values.
 
+    float32 arrays are checked in place, without a copy.
+
     Args:
-        embedding: Embedding vector as list of floats
+        embedding: Embedding vector as list of floats or numpy array
         expected_size: Expected embedding dimension
 
     Returns:
@@ -232,12 +561,10 @@ def is_valid_embedding(embedding: List[float], expected_size: int = 512) -> bool
     if len(embedding) != expected_size:
         return False
 
-    # Check for NaN or Inf values
+    # Check for NaN or Inf values in a single pass
     try:
-        arr = np.array(embedding, dtype=np.float32)
-        if np.any(np.isnan(arr)) or np.any(np.isinf(arr)):
-            return False
+        arr = np.asarray(embedding, dtype=np.float32)
     except (ValueError, TypeError):
         return False
 
-    return True
+    return arr.size == expected_size and bool(np.isfinite(arr).all())
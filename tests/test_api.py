@@ -2,24 +2,63 @@
 
 import base64
 import io
+import time
 from typing import Generator
 
+import httpx
 import numpy as np
+import orjson
 import pytest
 from fastapi.testclient import TestClient
 from PIL import Image
 
+from face_recognition_service.config import settings
 from face_recognition_service.main import app
-
-
-@pytest.fixture(scope="module")
+from face_recognition_service.schemas.api_schemas import ReferenceEmbedding
+from face_recognition_service.utils.embedding_utils import (
+    _NUMBA_MIN_ROWS,
+    Gallery,
+    batch_calculate_distances,
+    calculate_distance,
+    cosine_distance,
+    distance_to_similarity,
+    euclidean_distance,
+    find_best_match,
+    is_valid_embedding,
+    quantize_gallery,
+    quantized_cosine_distances,
+)
+from face_recognition_service.utils.image_utils import (
+    ImageProcessingError,
+    _cache_validators,
+    decode_base64_image,
+    encode_image_to_base64,
+    load_image_from_bytes,
+    preprocess_image,
+    validate_image,
+)
+
+# Seeded generator for test data, so runs are deterministic
+_RNG = np.random.default_rng(42)
+
+
+def _post_json(client: TestClient, url: str, payload: dict):
+    """POST a JSON body serialized with orjson (NumPy arrays are encoded natively)."""
+    return client.post(
+        url,
+        content=orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY),
+        headers={"Content-Type": "application/json"},
+    )
+
+
+@pytest.fixture(scope="session")
 def client() -> Generator[TestClient, None, None]:
-    """Create a test client for the FastAPI application."""
+    """Create a test client for the FastAPI application (model loaded once per session)."""
     with TestClient(app) as test_client:
         yield test_client
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sample_face_image_base64() -> str:
     """
     Create a sample face image for testing.
@@ -27,36 +66,36 @@ def sample_face_image_base64() -> str:
     Note: This is a synthetic image, not a real face.
     For real testing, use actual face images.
     """
-    # Create a simple test image (RGB)
-    img = Image.new('RGB', (200, 200), color='white')
-
-    # Add a simple face-like pattern (circle for head, dots for eyes)
-    pixels = img.load()
-    center_x, center_y = 100, 100
-
-    # Draw a circle (head)
-    for x in range(200):
-        for y in range(200):
-            dist = np.sqrt((x - center_x)**2 + (y - center_y)**2)
-            if 40 < dist < 60:
-                pixels[x, y] = (0, 0, 0)
-
-    # Convert to base64
+    # Create a simple test image (RGB) with a face-like pattern:
+    # a black ring (head) of radius 40-60 around the center
+    yy, xx = np.ogrid[:200, :200]
+    dist_sq = (xx - 100) ** 2 + (yy - 100) ** 2
+    pixels = np.full((200, 200, 3), 255, dtype=np.uint8)
+    pixels[(dist_sq > 40 ** 2) & (dist_sq < 60 ** 2)] = 0
+    img = Image.fromarray(pixels, 'RGB')
+
+    # Convert to bare base64 (uncompressed PNG: lossless and no entropy
+    # coding; the data URI prefix is optional)
     buffer = io.BytesIO()
-    img.save(buffer, format='JPEG')
-    buffer.seek(0)
-    base64_str = base64.b64encode(buffer.getvalue()).decode('utf-8')
+    img.save(buffer, format='PNG', compress_level=0)
+    return base64.b64encode(buffer.getbuffer()).decode('utf-8')
+
 
-    return f"data:image/jpeg;base64,{base64_str}"
+@pytest.fixture(scope="module")
+def sample_embedding() -> np.ndarray:
+    """Create a sample 512-dimensional float32 embedding (read-only, shared by the module)."""
+    # Create a normalized random embedding, seeded so tests are deterministic
+    embedding = np.random.default_rng(0).standard_normal(512, dtype=np.float32)
+    embedding /= np.linalg.norm(embedding)
+    embedding.setflags(write=False)
+    return embedding
 
 
-@pytest.fixture
-def sample_embedding() -> list[float]:
-    """Create a sample 512-dimensional embedding."""
-    # Create a normalized random embedding
-    embedding = np.random.randn(512).astype(np.float32)
-    embedding = embedding / np.linalg.norm(embedding)
-    return embedding.tolist()
+@pytest.fixture(scope="session")
+def encoded_pair() -> tuple[np.ndarray, str]:
+    """Create a random BGR image and its lossless (PNG) base64 encoding."""
+    original = np.random.default_rng(0).integers(0, 256, (100, 100, 3), dtype=np.uint8)
+    return original, encode_image_to_base64(original, format="PNG")
 
 
 class TestHealthEndpoints:
@@ -96,50 +135,42 @@ class TestEmbedEndpoint:
 
     def test_embed_endpoint_schema(self, client: TestClient, sample_face_image_base64: str):
         """Test that the embed endpoint accepts the correct schema."""
-        response = client.post(
-            "/api/v1/embed",
-            json={"image": sample_face_image_base64}
-        )
+        response = _post_json(client, "/api/v1/embed", {"image": sample_face_image_base64})
         # Note: This test may fail if no face is detected in the synthetic image
         # In real testing, use actual face images
         assert response.status_code in [200, 400]  # 400 if no face detected
 
     def test_embed_endpoint_invalid_base64(self, client: TestClient):
         """Test embed endpoint with invalid base64."""
-        response = client.post(
-            "/api/v1/embed",
-            json={"image": "invalid_base64!!!"}
-        )
+        response = _post_json(client, "/api/v1/embed", {"image": "invalid_base64!!!"})
         assert response.status_code == 400
         data = response.json()
         assert "error" in data
 
     def test_embed_endpoint_empty_image(self, client: TestClient):
         """Test embed endpoint with empty image."""
-        response = client.post(
-            "/api/v1/embed",
-            json={"image": ""}
-        )
+        response = _post_json(client, "/api/v1/embed", {"image": ""})
         assert response.status_code == 422  # Validation error
 
     def test_embed_endpoint_missing_image(self, client: TestClient):
         """Test embed endpoint without image field."""
-        response = client.post("/api/v1/embed", json={})
+        response = _post_json(client, "/api/v1/embed", {})
         assert response.status_code == 422  # Validation error
 
 
 class TestCompareEndpoint:
     """Tests for the embedding comparison endpoint."""
 
-    def test_compare_endpoint_cosine(self, client: TestClient, sample_embedding: list[float]):
+    def test_compare_endpoint_cosine(self, client: TestClient, sample_embedding: np.ndarray):
         """Test compare endpoint with cosine distance."""
         query = sample_embedding
         ref1 = sample_embedding.copy()
-        ref2 = np.random.randn(512).tolist()
+        ref2 = _RNG.standard_normal(512).tolist()
 
-        response = client.post(
+        response = _post_json(
+            client,
             "/api/v1/compare",
-            json={
+            {
                 "query_embedding": query,
                 "reference_embeddings": [
                     {"id": "user_001", "embedding": ref1},
@@ -161,14 +192,15 @@ class TestCompareEndpoint:
         assert data["best_match"]["id"] == "user_001"
         assert data["best_match"]["distance"] < 0.1  # Should be very close to 0
 
-    def test_compare_endpoint_euclidean(self, client: TestClient, sample_embedding: list[float]):
+    def test_compare_endpoint_euclidean(self, client: TestClient, sample_embedding: np.ndarray):
         """Test compare endpoint with euclidean distance."""
         query = sample_embedding
         ref1 = sample_embedding.copy()
 
-        response = client.post(
+        response = _post_json(
+            client,
             "/api/v1/compare",
-            json={
+            {
                 "query_embedding": query,
                 "reference_embeddings": [
                     {"id": "user_001", "embedding": ref1}
@@ -181,11 +213,58 @@ class TestCompareEndpoint:
         data = response.json()
         assert data["distance_metric"] == "euclidean"
 
-    def test_compare_endpoint_invalid_metric(self, client: TestClient, sample_embedding: list[float]):
+    def test_compare_endpoint_batch(self, client: TestClient, sample_embedding: np.ndarray):
+        """Test compare endpoint scoring 1000 references in one request."""
+        references = [
+            {"id": f"user_{i:04d}", "embedding": embedding}
+            for i, embedding in enumerate(_RNG.standard_normal((1000, 512), dtype=np.float32))
+        ]
+        references[617]["embedding"] = sample_embedding
+
+        start = time.perf_counter()
+        response = _post_json(
+            client,
+            "/api/v1/compare",
+            {
+                "query_embedding": sample_embedding,
+                "reference_embeddings": references,
+                "distance_metric": "cosine"
+            }
+        )
+        elapsed = time.perf_counter() - start
+
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["matches"]) == 1000
+        assert data["best_match"]["id"] == "user_0617"
+        # Generous bound: catches gross per-reference regressions, not timing noise
+        assert elapsed < 2.0
+
+    def test_compare_endpoint_binary_query(self, client: TestClient, sample_embedding: np.ndarray):
+        """Test compare endpoint with a base64 float32 query embedding."""
+        query = base64.b64encode(sample_embedding.astype("<f4").tobytes()).decode()
+
+        response = _post_json(
+            client,
+            "/api/v1/compare",
+            {
+                "query_embedding": query,
+                "reference_embeddings": [
+                    {"id": "user_001", "embedding": sample_embedding}
+                ],
+                "distance_metric": "cosine"
+            }
+        )
+
+        assert response.status_code == 200
+        assert response.json()["best_match"]["distance"] < 1e-5
+
+    def test_compare_endpoint_invalid_metric(self, client: TestClient, sample_embedding: np.ndarray):
         """Test compare endpoint with invalid distance metric."""
-        response = client.post(
+        response = _post_json(
+            client,
             "/api/v1/compare",
-            json={
+            {
                 "query_embedding": sample_embedding,
                 "reference_embeddings": [
                     {"id": "user_001", "embedding": sample_embedding}
@@ -200,9 +279,10 @@ class TestCompareEndpoint:
         """Test compare endpoint with wrong embedding size."""
         wrong_size_embedding = [0.1] * 256  # Wrong size
 
-        response = client.post(
+        response = _post_json(
+            client,
             "/api/v1/compare",
-            json={
+            {
                 "query_embedding": wrong_size_embedding,
                 "reference_embeddings": [
                     {"id": "user_001", "embedding": [0.1] * 512}
@@ -213,11 +293,12 @@ class TestCompareEndpoint:
 
         assert response.status_code == 422  # Validation error
 
-    def test_compare_endpoint_empty_references(self, client: TestClient, sample_embedding: list[float]):
+    def test_compare_endpoint_empty_references(self, client: TestClient, sample_embedding: np.ndarray):
         """Test compare endpoint with no reference embeddings."""
-        response = client.post(
+        response = _post_json(
+            client,
             "/api/v1/compare",
-            json={
+            {
                 "query_embedding": sample_embedding,
                 "reference_embeddings": [],
                 "distance_metric": "cosine"
@@ -226,34 +307,84 @@ class TestCompareEndpoint:
 
         assert response.status_code == 422  # Validation error
 
+    def test_compare_packed_float16(self, client: TestClient, sample_embedding: np.ndarray):
+        """Test compare-packed endpoint with a float16 reference matrix."""
+        refs = np.vstack([_RNG.standard_normal(512), sample_embedding]).astype("<f2")
+
+        response = _post_json(
+            client,
+            "/api/v1/compare-packed",
+            {
+                "query_embedding": sample_embedding,
+                "ids": ["user_001", "user_002"],
+                "reference_matrix": base64.b64encode(refs.tobytes()).decode(),
+                "dtype": "float16",
+                "distance_metric": "cosine"
+            }
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["matches"]) == 2
+        assert data["best_match"]["id"] == "user_002"
+        assert data["best_match"]["distance"] < 0.01
+
+    def test_compare_packed_wrong_size(self, client: TestClient, sample_embedding: np.ndarray):
+        """Test compare-packed endpoint with a matrix that does not match the IDs."""
+        refs = _RNG.standard_normal((1, 512)).astype("<f2")
+
+        response = _post_json(
+            client,
+            "/api/v1/compare-packed",
+            {
+                "query_embedding": sample_embedding,
+                "ids": ["user_001", "user_002"],
+                "reference_matrix": base64.b64encode(refs.tobytes()).decode(),
+                "dtype": "float16"
+            }
+        )
+
+        assert response.status_code == 422  # Validation error
+
 
 class TestEmbeddingUtils:
     """Tests for embedding utility functions."""
 
-    def test_cosine_distance_identical(self, sample_embedding: list[float]):
+    def test_cosine_distance_identical(self, sample_embedding: np.ndarray):
         """Test cosine distance between identical embeddings."""
-        from face_recognition_service.utils.embedding_utils import cosine_distance
-
-        emb = np.array(sample_embedding)
+        emb = sample_embedding
         distance = cosine_distance(emb, emb)
 
         # Distance between identical embeddings should be very close to 0
         assert distance < 0.001
 
-    def test_euclidean_distance_identical(self, sample_embedding: list[float]):
+    def test_euclidean_distance_identical(self, sample_embedding: np.ndarray):
         """Test euclidean distance between identical embeddings."""
-        from face_recognition_service.utils.embedding_utils import euclidean_distance
-
-        emb = np.array(sample_embedding)
+        emb = sample_embedding
         distance = euclidean_distance(emb, emb)
 
         # Distance between identical embeddings should be very close to 0
         assert distance < 0.001
 
+    def test_calculate_distance_kernels(self, sample_embedding: np.ndarray):
+        """Test that the compiled pairwise kernels agree with the NumPy functions."""
+        emb1 = sample_embedding
+        emb2 = _RNG.standard_normal(512)
+
+        assert abs(calculate_distance(emb1, emb2, "cosine") - cosine_distance(emb1, emb2)) < 1e-5
+        assert abs(calculate_distance(emb1, emb2, "euclidean") - euclidean_distance(emb1, emb2)) < 1e-4
+        assert calculate_distance(emb1, emb1, "euclidean") == 0.0
+
+        # Cached embeddings are read-only arrays
+        readonly = np.array(sample_embedding, dtype=np.float32)
+        readonly.flags.writeable = False
+        assert calculate_distance(readonly, emb2, "cosine") == calculate_distance(emb1, emb2, "cosine")
+
+        with pytest.raises(ValueError):
+            calculate_distance(emb1, emb2, "manhattan")
+
     def test_distance_to_similarity(self):
         """Test distance to similarity conversion."""
-        from face_recognition_service.utils.embedding_utils import distance_to_similarity
-
         # Cosine distance of 0 should give similarity of 1
         assert distance_to_similarity(0.0, "cosine") == 1.0
 
@@ -264,24 +395,118 @@ class TestEmbeddingUtils:
         assert distance_to_similarity(2.0, "cosine") == 0.0
         assert distance_to_similarity(10.0, "euclidean") < 0.1
 
+    def test_batch_calculate_distances_matches_pairwise(self, sample_embedding: np.ndarray):
+        """Test that batched distances agree with the pairwise functions."""
+        query = sample_embedding
+        # Rows with very different norms expose whole-matrix (instead of per-row) normalization
+        refs = _RNG.standard_normal((5, 512), dtype=np.float32) * np.array([[1.0], [5.0], [20.0], [0.1], [3.0]], dtype=np.float32)
+
+        cosine = batch_calculate_distances(query, refs, metric="cosine")
+        euclidean = batch_calculate_distances(query, refs, metric="euclidean")
+
+        for i, ref in enumerate(refs):
+            assert abs(cosine[i] - cosine_distance(query, ref)) < 1e-4
+            assert abs(euclidean[i] - euclidean_distance(query, ref)) < 1e-3
+
+    def test_batch_calculate_distances_large_gallery(self, sample_embedding: np.ndarray):
+        """Test that the parallel kernel used for large galleries matches BLAS scoring."""
+        query = sample_embedding
+        refs = _RNG.standard_normal((_NUMBA_MIN_ROWS + 500, 512), dtype=np.float32)
+        refs[0] = 0.0
+
+        distances = batch_calculate_distances(query, refs, metric="cosine")
+        refs_norm = refs[1:] / np.linalg.norm(refs[1:], axis=1, keepdims=True)
+        expected = 1.0 - refs_norm @ (query / np.linalg.norm(query))
+
+        assert distances.shape == (refs.shape[0],)
+        assert distances[0] == 1.0
+        assert np.allclose(distances[1:], expected, atol=1e-4)
+
+    def test_batch_euclidean_identical_reference(self, sample_embedding: np.ndarray):
+        """Test that an identical reference scores a Euclidean distance of ~0."""
+        query = sample_embedding * 20.0
+        refs = np.vstack([_RNG.standard_normal((3, 512), dtype=np.float32), query])
+
+        distances = batch_calculate_distances(query, refs, metric="euclidean")
+
+        assert distances[-1] < 1e-4
+        assert np.all(distances[:-1] > 1.0)
+
+    def test_find_best_match_gallery(self, sample_embedding: np.ndarray):
+        """Test ranking against a gallery built from reference embeddings."""
+        references = [
+            ReferenceEmbedding(id="other", embedding=_RNG.standard_normal(512).tolist()),
+            ReferenceEmbedding(id="same", embedding=sample_embedding),
+        ]
+        gallery = Gallery.from_reference_embeddings(references)
+
+        assert gallery.embeddings.shape == (2, 512)
+        assert gallery.embeddings.dtype == np.float32
+        assert list(gallery.ids) == ["other", "same"]
+
+        matches, best_match = find_best_match(sample_embedding, gallery, metric="cosine")
+        assert best_match.id == "same"
+        assert [match.id for match in matches] == ["same", "other"]
+
+    def test_find_best_match_top_k(self, sample_embedding: np.ndarray):
+        """Test that top_k returns the leading matches of the full ranking."""
+        references = _RNG.standard_normal((200, 512), dtype=np.float32)
+        references[10] = references[20]  # tie
+        gallery = Gallery(np.array([f"user_{i}" for i in range(200)], dtype=object), references)
+
+        all_matches, best_match = find_best_match(sample_embedding, gallery, metric="cosine")
+        for top_k in (1, 5, 200, 500):
+            matches, top_best = find_best_match(sample_embedding, gallery, metric="cosine", top_k=top_k)
+            assert [m.id for m in matches] == [m.id for m in all_matches[:top_k]]
+            assert top_best.id == best_match.id
+
+    def test_fp16_gallery_matches_fp32(self, sample_embedding: np.ndarray):
+        """Test that an fp16-stored gallery scores within fp16 error of fp32."""
+        query = sample_embedding
+        refs = _RNG.standard_normal((20, 512), dtype=np.float32)
+        ids = np.arange(20).astype(object)
+        fp32 = Gallery(ids, refs)
+        fp16 = Gallery(ids, refs, precision="fp16")
+
+        assert fp16.embeddings.dtype == np.float16
+        for metric in ("cosine", "euclidean"):
+            expected = batch_calculate_distances(query, fp32, metric=metric)
+            actual = batch_calculate_distances(query, fp16, metric=metric)
+            assert np.allclose(actual, expected, atol=1e-2)
+
+    def test_quantized_cosine_distances(self, sample_embedding: np.ndarray):
+        """Test that int8-quantized scoring tracks float cosine distance."""
+        query = sample_embedding
+        refs = _RNG.standard_normal((10, 512), dtype=np.float32)
+        refs[0] = query
+
+        quantized, scales = quantize_gallery(refs)
+        distances = quantized_cosine_distances(query, quantized, scales)
+
+        assert quantized.dtype == np.int8
+        assert distances.shape == (10,)
+        for ref, distance in zip(refs, distances):
+            assert abs(distance - cosine_distance(query, ref)) < 0.01
+
     def test_is_valid_embedding(self):
         """Test embedding validation."""
-        from face_recognition_service.utils.embedding_utils import is_valid_embedding
-
-        # Valid embedding
-        valid = [0.1] * 512
+        # Valid embedding (float32 arrays are checked without conversion)
+        valid = np.full(512, 0.1, dtype=np.float32)
         assert is_valid_embedding(valid, 512) is True
+        assert is_valid_embedding(valid.tolist(), 512) is True
 
         # Invalid size
-        invalid_size = [0.1] * 256
+        invalid_size = np.full(256, 0.1, dtype=np.float32)
         assert is_valid_embedding(invalid_size, 512) is False
 
         # With NaN
-        with_nan = [0.1] * 511 + [float('nan')]
+        with_nan = valid.copy()
+        with_nan[-1] = np.nan
         assert is_valid_embedding(with_nan, 512) is False
 
         # With Inf
-        with_inf = [0.1] * 511 + [float('inf')]
+        with_inf = valid.copy()
+        with_inf[-1] = np.inf
         assert is_valid_embedding(with_inf, 512) is False
 
 
@@ -290,9 +515,7 @@ class TestImageUtils:
 
     def test_validate_image_valid(self):
         """Test image validation with valid image."""
-        from face_recognition_service.utils.image_utils import validate_image
-
-        valid_image = np.random.randint(0, 255, (100, 100, 3), dtype=np.uint8)
+        valid_image = _RNG.integers(0, 256, (100, 100, 3), dtype=np.uint8)
         is_valid, error = validate_image(valid_image)
 
         assert is_valid is True
@@ -300,9 +523,7 @@ class TestImageUtils:
 
     def test_validate_image_too_small(self):
         """Test image validation with too small image."""
-        from face_recognition_service.utils.image_utils import validate_image
-
-        small_image = np.random.randint(0, 255, (10, 10, 3), dtype=np.uint8)
+        small_image = _RNG.integers(0, 256, (10, 10, 3), dtype=np.uint8)
         is_valid, error = validate_image(small_image)
 
         assert is_valid is False
@@ -310,22 +531,41 @@ class TestImageUtils:
 
     def test_validate_image_none(self):
         """Test image validation with None."""
-        from face_recognition_service.utils.image_utils import validate_image
-
         is_valid, error = validate_image(None)
 
         assert is_valid is False
         assert error is not None
 
+    def test_preprocess_image_converts_to_bgr(self, monkeypatch: pytest.MonkeyPatch):
+        """Test that preprocessing yields 3-channel BGR and rejects invalid images."""
+        monkeypatch.setattr(settings, "enhance_image", False)
+
+        bgr = _RNG.integers(0, 256, (100, 100, 3), dtype=np.uint8)
+        assert preprocess_image(bgr) is bgr
+        assert preprocess_image(bgr[:, :, 0]).shape == (100, 100, 3)
+        assert preprocess_image(np.dstack([bgr, bgr[:, :, :1]])).shape == (100, 100, 3)
+
+        with pytest.raises(ImageProcessingError, match="too small"):
+            preprocess_image(bgr[:10])
+
+    def test_reduced_jpeg_decode(self, monkeypatch: pytest.MonkeyPatch):
+        """Test that large JPEGs are decoded at reduced scale when enabled."""
+        buffer = io.BytesIO()
+        Image.new("RGB", (1600, 1200), color=(128, 64, 32)).save(buffer, format="JPEG")
+        image_bytes = buffer.getvalue()
+
+        assert load_image_from_bytes(image_bytes).shape == (1200, 1600, 3)
+
+        monkeypatch.setattr(settings, "jpeg_decode_min_side", 400)
+        assert load_image_from_bytes(image_bytes).shape == (300, 400, 3)
+
+        monkeypatch.setattr(settings, "jpeg_decode_min_side", 1000)
+        assert load_image_from_bytes(image_bytes).shape == (1200, 1600, 3)
+
     def test_encode_decode_image(self):
         """Test encoding and decoding images."""
-        from face_recognition_service.utils.image_utils import (
-            decode_base64_image,
-            encode_image_to_base64
-        )
-
         # Create a test image
-        original = np.random.randint(0, 255, (100, 100, 3), dtype=np.uint8)
+        original = _RNG.integers(0, 256, (100, 100, 3), dtype=np.uint8)
 
         # Encode
         base64_str = encode_image_to_base64(original, format="JPEG")
@@ -336,6 +576,26 @@ class TestImageUtils:
         # Check shape matches (JPEG is lossy, so exact match not expected)
         assert decoded.shape == original.shape
 
+    def test_encode_decode_image_lossless(self, encoded_pair: tuple[np.ndarray, str]):
+        """Test that a PNG round trip restores the exact pixels."""
+        original, base64_str = encoded_pair
+        assert base64_str.startswith("data:image/png;base64,")
+        assert np.array_equal(decode_base64_image(base64_str), original)
+
+        # The data URI prefix is optional
+        bare = base64_str.partition(",")[2]
+        assert np.array_equal(decode_base64_image(bare), original)
+
+    def test_cache_validators(self):
+        """Test conditional request headers built from response validators."""
+        headers = httpx.Headers({"ETag": '"abc"', "Last-Modified": "Wed, 14 Oct 2026 10:00:00 GMT"})
+        assert _cache_validators(headers) == {
+            "If-None-Match": '"abc"',
+            "If-Modified-Since": "Wed, 14 Oct 2026 10:00:00 GMT",
+        }
+        assert _cache_validators(httpx.Headers({"ETag": '"abc"', "Cache-Control": "no-store"})) == {}
+        assert _cache_validators(httpx.Headers()) == {}
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])